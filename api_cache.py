@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+CACHE_PATH = os.environ.get("YT_CACHE_PATH", ".youtube_cache.sqlite3")
+
+# how long a response stays fresh, in seconds. search results and channel info change slowly, comments change fast
+ENDPOINT_TTLS = {
+    "search": 24 * 3600,
+    "channels": 6 * 3600,
+    "playlistItems": 3600,
+    "videos": 3600,
+    "commentThreads": 1800
+}
+
+# quota units charged by the YouTube Data API for one list call of each endpoint
+QUOTA_COSTS = {
+    "search": 100,
+    "channels": 1,
+    "playlistItems": 1,
+    "videos": 1,
+    "commentThreads": 1
+}
+
+MAX_ENTRIES = 50000
+MAX_BYTES = 256 * 1024 * 1024
+EVICT_CHECK_EVERY = 50 # writes between two size checks
+
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles") # the daily quota resets at midnight Pacific time
+
+
+def quota_day():
+    return datetime.now(QUOTA_TIMEZONE).strftime("%Y-%m-%d")
+
+
+def cache_key(endpoint, params):
+    # None values (e.g. the first pageToken) do not change the request, so they are left out of the key
+    clean = {k: v for k, v in params.items() if v is not None}
+    raw = endpoint + json.dumps(clean, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite file holding API responses keyed by endpoint + parameters, plus a daily quota counter."""
+
+    def __init__(self, path=CACHE_PATH, ttls=None, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.ttls = {**ENDPOINT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock() # one connection shared by the comment worker threads
+        self.writes = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+            CREATE TABLE IF NOT EXISTS quota (
+                day TEXT NOT NULL,
+                endpoint TEXT NOT NULL,
+                calls INTEGER NOT NULL,
+                units INTEGER NOT NULL,
+                PRIMARY KEY (day, endpoint)
+            );
+        """)
+
+    def get(self, endpoint, params):
+        key = cache_key(endpoint, params)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT payload, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            payload, created = row
+            if now - created > self.ttls.get(endpoint, 0): # stale, drop it so the caller refetches
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.conn.commit()
+                return None
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key)) # LRU bookkeeping
+            self.conn.commit()
+        return json.loads(payload)
+
+    def put(self, endpoint, params, response):
+        if not self.ttls.get(endpoint):
+            return
+        payload = json.dumps(response)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, payload, size, created, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key(endpoint, params), endpoint, payload, len(payload), now, now)
+            )
+            self.writes += 1
+            if self.writes % EVICT_CHECK_EVERY == 0:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        # drop least recently used entries until both the entry and byte limits hold again
+        count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        freed_count, freed_bytes = 0, 0
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if count - freed_count <= self.max_entries and total - freed_bytes <= self.max_bytes:
+                break
+            doomed.append((key,))
+            freed_count += 1
+            freed_bytes += size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def add_quota(self, endpoint, calls=1):
+        units = QUOTA_COSTS.get(endpoint, 1) * calls
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO quota (day, endpoint, calls, units) VALUES (?, ?, ?, ?)
+                ON CONFLICT (day, endpoint) DO UPDATE SET calls = calls + excluded.calls, units = units + excluded.units
+            """, (quota_day(), endpoint, calls, units))
+            self.conn.commit()
+
+    def quota_used(self, day=None):
+        """Returns (total units, {endpoint: {"calls": n, "units": n}}) spent on the given quota day."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT endpoint, calls, units FROM quota WHERE day = ?", (day or quota_day(),)
+            ).fetchall()
+        per_endpoint = {endpoint: {"calls": calls, "units": units} for endpoint, calls, units in rows}
+        return sum(units for _, _, units in rows), per_endpoint
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Returns the process wide cache, opened on first use. Set YT_CACHE_DISABLED=1 to turn it off."""
+    global _cache
+    if os.environ.get("YT_CACHE_DISABLED") == "1":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+    return _cache
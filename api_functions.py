@@ -0,0 +1,331 @@
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
+import threading
+import time
+from contextlib import contextmanager
+import pandas as pd
+from api_cache import get_cache
+from api_scheduler import get_scheduler, QuotaExhausted, error_reason
+import metrics
+
+# 🔐 Setup YouTube client
+api_key = "your api key" #it can be acquired through google developer sign in
+youtube = build('youtube', 'v3', developerKey=api_key)
+
+logger = logging.getLogger(__name__)
+_thread_local = threading.local() # each worker thread keeps its own client here
+
+
+def _build_client():
+    return build('youtube', 'v3', developerKey=api_key)
+
+
+_client_factory = _build_client
+
+
+def use_client_factory(factory):
+    """Points every API call at clients made by factory(), e.g. a fake resource for offline benchmarks."""
+    global youtube, _client_factory
+    _client_factory = factory
+    youtube = factory()
+    _thread_local.__dict__.clear() # this thread's old client; worker threads are created per call
+
+
+_refreshing = 0 # number of active fresh_responses() blocks
+_refreshing_lock = threading.Lock()
+
+
+@contextmanager
+def fresh_responses():
+    """API calls made inside the with-block skip the response cache lookup but still store what they fetch.
+
+    The switch is process wide so the worker threads of a run are covered too; other harvests running at
+    the same time also fetch fresh responses while it is on, which costs quota but never returns stale data.
+    """
+    global _refreshing
+    with _refreshing_lock:
+        _refreshing += 1
+    try:
+        yield
+    finally:
+        with _refreshing_lock:
+            _refreshing -= 1
+
+
+def get_thread_client():
+    # the http object inside a client is not thread safe, so every worker thread builds its own client once and reuses it
+    if not hasattr(_thread_local, 'youtube'):
+        _thread_local.youtube = _client_factory()
+    return _thread_local.youtube
+
+
+def _execute(endpoint, client=None, **params):
+    # every API call goes through here: answered from the on-disk cache when fresh, otherwise fetched and stored
+    cache = get_cache()
+    if cache is not None and not _refreshing: # a refresh run reads the API, the fresh response is still cached below
+        cached = cache.get(endpoint, params)
+        if cached is not None:
+            metrics.record_api_call(endpoint, cached=True)
+            return cached
+    client = client or youtube
+    # the scheduler applies the rate limit and quota budget and retries rate-limit / 5xx errors with backoff
+    response = get_scheduler().execute(
+        endpoint, lambda: getattr(client, endpoint)().list(**params).execute() # e.g. youtube.videos().list(...).execute()
+    )
+    metrics.record_api_call(endpoint)
+    if cache is not None:
+        cache.put(endpoint, params, response)
+    return response
+
+
+class RequestThrottle:
+    """Caps how many API requests are started per second across all worker threads."""
+
+    def __init__(self, max_requests_per_second):
+        self.interval = 1.0 / max_requests_per_second if max_requests_per_second else 0 # gap needed between two requests
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock: # each caller reserves the next free slot, then sleeps outside the lock until it arrives
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def get_channel_ids(query="data science", max_results=10): #query helps search the youtube channel according to the type of channel enter in query
+    search_response = _execute('search', # in search_response has item, id in JSON/dic format, inside item dic it has snippet,id as key. 
+        q=query,
+        part='snippet',#in snippet it has publishedAt,channelId,title,description, this the required parameter.
+        type='channel',
+        maxResults=max_results #max result will limit to 10 no of channels.
+    )
+
+    return [item['id']['channelId'] for item in search_response['items']] #it will return the channel id
+
+
+def get_channel_data(channel_ids, client=None):
+    channel_data = []  # it will content the all channel details.
+    playlist_data = [] # it will content the all playlist data of each channel.
+
+    for i in range(0, len(channel_ids), 50): # the id parameter takes at most 50 ids per request
+        channel_response = _execute('channels', client=client, # it will item as JSON/dic it have key id,snippet, statistics, content details.
+            part='snippet,statistics,contentDetails', #statistics as a JSON/dic will have viewCount, subscriberCount,videoCount etc. 
+            # inside content details as dic one more dic as relatedPlaylists which will have likes,Playlists id.
+            id=','.join(channel_ids[i:i+50]) #single comma-separated string.
+        )
+        _collect_channels(channel_response, channel_data, playlist_data)
+    return channel_data, playlist_data
+
+
+def _collect_channels(channel_response, channel_data, playlist_data):
+    for channel_info in channel_response.get('items', []):# each channel_info content the details of snippet,statistics,contentdetails for each channel id.
+        channel_data.append({
+            "channel_Name": channel_info['snippet']['title'],
+            "channel_id": channel_info['id'],
+            "Subscription_Count": channel_info['statistics']['subscriberCount'],
+            "Channel_Views": channel_info['statistics']['viewCount'],
+            "Channel_Description": channel_info['snippet']['description'],
+            "Playlist_Id": channel_info['contentDetails']['relatedPlaylists']['uploads']
+        })
+
+        playlist_data.append({
+            "playlist_id": channel_info['contentDetails']['relatedPlaylists']['uploads'],
+            "channel_id": channel_info['id'],
+            "playlist_name": f"{channel_info['snippet']['title']} uploads"
+        })
+
+
+def iter_playlist_video_ids(playlist_id, max_videos=None, client=None, throttle=None, published_after=None):
+    """Yields the video ids of one playlist page by page (50 per page), following nextPageToken.
+
+    published_after is an ISO timestamp ("2024-01-31T10:00:00Z"), uploads come newest first so paging stops at the first older video.
+    """
+    page_token = None
+    fetched = 0
+    while True:
+        if throttle:
+            throttle.wait()
+        video_response = _execute('playlistItems', client=client, # it will item as JSON/dic in this key as id,contentDetails.
+            part='contentDetails',#contentDetails will have videoId
+            playlistId=playlist_id,
+            maxResults=50, #You can fetch up to 50 items per request using maxResults=50 it is max limit.
+            pageToken=page_token
+            )
+
+        items = video_response.get('items', [])
+        reached_watermark = False
+        if published_after:
+            newer = [item for item in items if item['contentDetails'].get('videoPublishedAt', '9999') > published_after] # private videos have no date, keep them
+            reached_watermark = len(newer) < len(items)
+            items = newer
+        ids = [item['contentDetails']['videoId'] for item in items] #it will retrieve the video ids
+        if max_videos is not None:
+            ids = ids[:max_videos - fetched] # cut the last page so the cap is respected exactly
+        if ids:
+            fetched += len(ids)
+            yield ids
+
+        page_token = video_response.get('nextPageToken') # no token means this was the last page
+        if not page_token or reached_watermark or (max_videos is not None and fetched >= max_videos):
+            return
+
+
+def get_video_ids(uploads_playlist_ids, max_videos_per_channel=None):
+    all_video_ids = [] #it will content all the video id for all channel
+    video_playlist_map = {} #it will content map video id with respective upload id
+    for pid in uploads_playlist_ids:
+        for ids in iter_playlist_video_ids(pid, max_videos=max_videos_per_channel):
+            all_video_ids.extend(ids) #it will stack the id one after other in list 
+            for vid in ids:
+                video_playlist_map[vid] = pid # it will create the key pair with each video id to there respective upload id
+            
+    return all_video_ids,video_playlist_map
+
+
+def get_video_details(video_ids,video_playlist_map, client=None):
+    video_data = [] # it will content all video data for each video id
+
+    for i in range(0, len(video_ids), 50):  # chunked to avoid API limits, which is 50 
+        chunk = video_ids[i:i+50]
+        video_response = _execute('videos', client=client, # it will item as json/dic in which key will snippet, statistics,content details.
+            part='snippet,statistics,contentDetails',
+            id=','.join(chunk)
+        )
+
+        for video in video_response['items']:
+            snippet = video['snippet']
+            stats = video['statistics']
+            content = video['contentDetails']
+            video_data.append({
+                "Video_Id": video['id'],
+                "playlist_id": video_playlist_map.get( video['id'], None), #get will help to assign palylist id to each video id
+                "Video_Name": snippet['title'],
+                "Video_Description": snippet['description'],
+                "Tags": snippet.get('tags', []),
+                "PublishedAt": snippet['publishedAt'],
+                "View_Count": stats.get('viewCount', '0'), # get will help us get viewCount if there is none than it will be zero.
+                "Like_Count": stats.get('likeCount', '0'),
+                "Favorite_Count": stats.get('favoriteCount', '0'),
+                "Comment_Count": stats.get('commentCount', '0'),
+                "Duration": content['duration'],
+                "Thumbnail": snippet['thumbnails']['high']['url'],
+                "Caption_Status": content['caption']
+            })
+
+    return video_data
+
+
+def _comment_record(item):
+    comment = item['snippet']['topLevelComment']['snippet']
+    return {
+        "Comment_Id": item['id'],
+        "video_id": item['snippet']['videoId'],
+        "Comment_Text": comment['textDisplay'],
+        "Comment_Author": comment['authorDisplayName'],
+        "Comment_PublishedAt": comment['publishedAt']
+    }
+
+
+def iter_comment_threads(video_id, max_comments=None, client=None, throttle=None, published_after=None):
+    """Yields the top level comments of one video page by page (100 per page), following nextPageToken.
+
+    Threads are returned newest first (order='time'), so with published_after paging stops at the first older comment.
+    """
+    page_token = None
+    fetched = 0
+    while True:
+        if throttle:
+            throttle.wait()
+        comments_response = _execute('commentThreads', client=client, # it fetch topLevelComment, each id
+            part='snippet',
+            videoId=video_id,
+            maxResults=100,
+            order='time',
+            pageToken=page_token
+            )
+
+        batch = [_comment_record(item) for item in comments_response.get('items', [])] #here get will help to handle if video doesn't have comment than it handle it and return empty list
+        reached_watermark = False
+        if published_after:
+            newer = [c for c in batch if c['Comment_PublishedAt'] > published_after]
+            reached_watermark = len(newer) < len(batch)
+            batch = newer
+        if max_comments is not None:
+            batch = batch[:max_comments - fetched]
+        if batch:
+            fetched += len(batch)
+            yield batch
+
+        page_token = comments_response.get('nextPageToken')
+        if not page_token or reached_watermark or (max_comments is not None and fetched >= max_comments):
+            return
+
+
+def _fetch_video_comments(client, video_id, max_comments=None, throttle=None, published_after=None):
+    comment_data = []
+    for batch in iter_comment_threads(video_id, max_comments=max_comments, client=client, throttle=throttle, published_after=published_after):
+        comment_data.extend(batch)
+    return comment_data
+
+
+def _comment_error(video_id, error):
+    # structured record of a failed video so the caller can show or retry it
+    status = error.resp.status if isinstance(error, HttpError) else None
+    reason = "quotaExhausted" if isinstance(error, QuotaExhausted) else error_reason(error) if isinstance(error, HttpError) else None
+    return {"video_id": video_id, "status": status, "reason": reason, "error": str(error)}
+
+
+def get_comment_details(video_ids, max_comments_per_video=None):
+    comment_data = [] #it will content all the comment data for each video
+
+    for id_s in video_ids:
+        try:
+            comment_data.extend(_fetch_video_comments(youtube, id_s, max_comments_per_video))
+        except HttpError as e: # e.g. comments disabled or video removed; transient errors were already retried by the scheduler
+            logger.info("skipping comments of video %s: %s", id_s, _comment_error(id_s, e))
+
+    return comment_data
+
+
+def get_comment_details_concurrent(video_ids, max_workers=8, max_requests_per_second=None, max_comments_per_video=None, published_after=None):
+    """Fetches comments for many videos in parallel, returns (comment_data, errors).
+
+    published_after optionally maps video id -> ISO timestamp, only comments newer than it are fetched for that video.
+    The global rate limit lives in the request scheduler, max_requests_per_second adds a tighter cap for this call only.
+    """
+    comment_data = []
+    errors = [] # one dict per video that failed, e.g. comments disabled
+    throttle = RequestThrottle(max_requests_per_second)
+
+    def fetch(video_id):
+        watermark = (published_after or {}).get(video_id)
+        return _fetch_video_comments(get_thread_client(), video_id, max_comments_per_video, throttle, watermark) # throttle is applied per page
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch, vid): vid for vid in video_ids} # future -> video id, to know which video failed
+        for future in as_completed(futures):
+            try:
+                comment_data.extend(future.result())
+            except Exception as e:
+                errors.append(_comment_error(futures[future], e))
+
+    return comment_data, errors
+
+def convert_to_dataframes(channel_data, playlist_data,video_data, comment_data):
+    """Converts raw data lists into pandas DataFrames."""
+    channel_df = pd.DataFrame(channel_data)
+    playlist_df = pd.DataFrame(playlist_data)
+    video_df = pd.DataFrame(video_data)
+    comment_df = pd.DataFrame(comment_data)
+    return channel_df, playlist_df, video_df, comment_df
+
+
+
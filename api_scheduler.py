@@ -0,0 +1,168 @@
+"""Request scheduling for the YouTube client: rate limit, retry with backoff, daily quota budget and priorities.
+
+Every API call goes through RequestScheduler.execute (see _execute in api_functions).
+"""
+import heapq
+import itertools
+import logging
+import os
+import random
+import socket
+import threading
+import time
+
+from googleapiclient.errors import HttpError
+
+import metrics
+from api_cache import QUOTA_COSTS, get_cache, quota_day
+
+logger = logging.getLogger(__name__)
+
+# lower number = more important. Channel and video metadata are worth more than comments when quota runs low.
+ENDPOINT_PRIORITY = {
+    "search": 0,
+    "channels": 0,
+    "playlistItems": 1,
+    "videos": 1,
+    "commentThreads": 2
+}
+
+REQUESTS_PER_SECOND = float(os.environ.get("YT_REQUESTS_PER_SECOND", 10))
+DAILY_QUOTA = int(os.environ.get("YT_DAILY_QUOTA", 10000)) # default quota of an API key
+QUOTA_RESERVE = int(os.environ.get("YT_QUOTA_RESERVE", 500)) # units kept for priority 0/1 calls, comments stop here
+
+RETRY_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError", "internalError"}
+QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+
+
+class QuotaExhausted(Exception):
+    """The daily budget (or the share of it left for this priority) is used up, the request was not sent."""
+
+
+def error_reason(error):
+    # first "reason" of an HttpError, e.g. rateLimitExceeded, quotaExceeded, commentsDisabled
+    try:
+        return error.error_details[0]["reason"]
+    except (AttributeError, IndexError, KeyError, TypeError):
+        return None
+
+
+def is_retryable(error):
+    if isinstance(error, HttpError):
+        status = error.resp.status
+        return status >= 500 or status == 429 or (status == 403 and error_reason(error) in RETRY_REASONS)
+    return isinstance(error, (socket.timeout, ConnectionError, TimeoutError))
+
+
+class TokenBucket:
+    """Allows `rate` requests per second with bursts up to `capacity`; waiting callers are served by priority."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.condition = threading.Condition()
+        self.waiting = [] # heap of (priority, arrival) tickets
+        self.arrivals = itertools.count()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, priority=0):
+        if not self.rate:
+            return
+        with self.condition:
+            ticket = (priority, next(self.arrivals))
+            heapq.heappush(self.waiting, ticket)
+            while True:
+                self._refill()
+                if self.waiting[0] == ticket and self.tokens >= 1: # only the most important waiter may take a token
+                    heapq.heappop(self.waiting)
+                    self.tokens -= 1
+                    self.condition.notify_all() # the next ticket is now at the head
+                    return
+                self.condition.wait(timeout=max(0.001, (1 - self.tokens) / self.rate))
+
+
+class QuotaBudget:
+    """Daily quota in units, priced per endpoint. Seeded from the cache's persistent counter so restarts keep count."""
+
+    def __init__(self, daily_units=DAILY_QUOTA, reserve=QUOTA_RESERVE):
+        self.daily_units = daily_units
+        self.reserve = reserve
+        self.lock = threading.Lock()
+        self.day = None
+        self.used = 0
+
+    def _roll_day(self):
+        day = quota_day()
+        if day != self.day: # first call, or the quota reset at Pacific midnight
+            cache = get_cache()
+            self.day = day
+            self.used = cache.quota_used(day)[0] if cache is not None else 0
+
+    def remaining(self):
+        with self.lock:
+            self._roll_day()
+            return self.daily_units - self.used
+
+    def charge(self, endpoint, priority):
+        """Books the cost of one call, raises QuotaExhausted instead when it does not fit."""
+        cost = QUOTA_COSTS.get(endpoint, 1)
+        with self.lock:
+            self._roll_day()
+            left = self.daily_units - self.used
+            floor = self.reserve if priority >= 2 else 0 # low priority calls may not eat into the reserve
+            if left - cost < floor:
+                raise QuotaExhausted(f"{endpoint}: {left} units left today, {floor} reserved for metadata")
+            self.used += cost
+        metrics.record_quota(endpoint, cost)
+        cache = get_cache()
+        if cache is not None:
+            cache.add_quota(endpoint) # persistent per-day counter shown in the app
+
+
+class RequestScheduler:
+    """Runs API calls under the rate limit and quota budget, retrying transient failures with backoff."""
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, budget=None, max_retries=5, base_delay=1.0, max_delay=32.0):
+        self.bucket = TokenBucket(rate)
+        self.budget = budget or QuotaBudget()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def execute(self, endpoint, request_fn):
+        """Calls request_fn() (which must send the request and return the response) for the given endpoint."""
+        priority = ENDPOINT_PRIORITY.get(endpoint, 1)
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire(priority)
+            self.budget.charge(endpoint, priority) # failed calls cost quota too
+            try:
+                return request_fn()
+            except Exception as e:
+                if isinstance(e, HttpError) and error_reason(e) in QUOTA_REASONS:
+                    raise QuotaExhausted(f"{endpoint}: quota exceeded on the server side") from e
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                # exponential backoff with full jitter, so parallel workers do not retry in lockstep
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                logger.warning("%s failed (%s), retry %d in %.1fs", endpoint, e, attempt + 1, delay)
+                metrics.record_api_retry(endpoint)
+                time.sleep(delay)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Returns the process wide scheduler, shared by every thread that talks to the API."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+    return _scheduler
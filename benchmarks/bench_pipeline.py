@@ -0,0 +1,143 @@
+"""Offline end-to-end benchmark: fake YouTube API -> harvest -> transform -> load -> ten summary queries.
+
+No API key or MySQL server needed: the client is benchmarks/fake_youtube.FakeYouTube and the warehouse is the
+SQLite stand-in in benchmarks/sqlite_warehouse.py.
+
+    python benchmarks/bench_pipeline.py --scales small,medium --latency-ms 20 --output bench.json
+    python benchmarks/bench_pipeline.py --compare bench.json        # run again and compare with a previous report
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT) # run from anywhere, modules live in the repo root
+
+# offline run: no response cache, no rate limit, no daily quota. Set before the modules read them.
+os.environ["YT_CACHE_DISABLED"] = "1"
+os.environ["YT_REQUESTS_PER_SECOND"] = "0"
+os.environ["YT_DAILY_QUOTA"] = str(10**12)
+
+import api_functions
+import sql_migration
+from benchmarks.fake_youtube import FakeYouTube
+from benchmarks.sqlite_warehouse import create_warehouse
+from harvest import run_pipeline
+from transform import normalize_video_df, normalize_comment_df
+
+# scale -> (channels, videos per channel, comments per video)
+SCALES = {
+    "small": (5, 50, 20),
+    "medium": (20, 200, 50),
+    "large": (50, 400, 50)
+}
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, round(time.perf_counter() - start, 4)
+
+
+def bench_scale(name, latency, workers, query_repeat, workdir):
+    channels, videos_per_channel, comments_per_video = SCALES[name]
+    fake = FakeYouTube(channels, videos_per_channel, comments_per_video, latency=latency)
+    api_functions.use_client_factory(lambda: fake) # the fake keeps no per-request state, threads can share it
+    sql_migration.use_connection_factory(create_warehouse(os.path.join(workdir, f"{name}.sqlite3")))
+
+    harvest, fetch_seconds = _timed(
+        run_pipeline, channel_ids=fake.channel_ids, load=False, max_workers=workers, max_comments_per_video=comments_per_video
+    )
+    channel_df, playlist_df, video_df, comment_df = harvest["frames"]
+
+    def transform():
+        normalize_video_df(video_df)
+        normalize_comment_df(comment_df)
+    _, transform_seconds = _timed(transform)
+
+    load_stats, load_seconds = _timed(sql_migration.insert_data_to_mysql, channel_df, playlist_df, video_df, comment_df)
+
+    queries = {}
+    for question in sql_migration.QUERY_MAP:
+        number = question.split(".")[0]
+        # the result cache would answer every repeat from memory, the database is what is measured here
+        runs = [_timed(sql_migration.get_channel_summary, [question], use_cache=False)[1] for _ in range(query_repeat)]
+        queries[number] = min(runs) # best of N, the least noisy figure for comparing runs
+
+    return {
+        "sizes": {"channels": len(channel_df), "videos": len(video_df), "comments": len(comment_df)},
+        "fetch": fetch_seconds,
+        "fetch_stages": harvest["timings"],
+        "transform": transform_seconds,
+        "load": load_seconds,
+        "load_rows_per_sec": {table: stats["rows_per_sec"] for table, stats in load_stats.items() if table in sql_migration.LOAD_ORDER},
+        "queries": queries
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _flatten(report, prefix=""):
+    # {"small": {"queries": {"1": 0.01}}} -> {"small.queries.1": 0.01}, numbers only
+    flat = {}
+    for key, value in report.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(previous, current):
+    """Prints every timing of the previous report next to the current one, slower or faster as a ratio."""
+    before, after = _flatten(previous["scales"]), _flatten(current["scales"])
+    print(f"\n{'metric':<40} {'before':>10} {'after':>10} {'after/before':>13}")
+    for key in sorted(before.keys() & after.keys()):
+        if ".sizes." in key:
+            continue
+        ratio = after[key] / before[key] if before[key] else float("nan")
+        print(f"{key:<40} {before[key]:>10} {after[key]:>10} {ratio:>12.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark.")
+    parser.add_argument("--scales", default="small,medium", help=f"comma separated, from {', '.join(SCALES)}")
+    parser.add_argument("--latency-ms", type=float, default=0, help="simulated API round trip per request")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--query-repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", metavar="REPORT", help="previous JSON report to compare against")
+    args = parser.parse_args()
+
+    report = {
+        "run_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "latency_ms": args.latency_ms,
+        "workers": args.workers,
+        "scales": {}
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in args.scales.split(","):
+            report["scales"][name] = bench_scale(name, args.latency_ms / 1000, args.workers, args.query_repeat, workdir)
+            print(f"{name}: {json.dumps(report['scales'][name])}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Compares the per-row type helpers with the vectorized transform stage.
+
+    python benchmarks/bench_transform.py --rows 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # run from anywhere, modules live in the repo root
+
+from sql_migration import parse_duration, parse_mysql_datetime
+from transform import to_counts, to_timestamps, to_duration_seconds
+
+
+def make_video_frame(rows, bad_ratio=0.001, seed=7):
+    # synthetic API-shaped columns, with a small share of broken values so both paths hit their error branch
+    rng = random.Random(seed)
+
+    def duration():
+        h, m, s = rng.randint(0, 2), rng.randint(0, 59), rng.randint(0, 59)
+        return "PT" + (f"{h}H" if h else "") + (f"{m}M" if m else "") + f"{s}S"
+
+    def maybe_bad(value, bad):
+        return bad if rng.random() < bad_ratio else value
+
+    return pd.DataFrame({
+        "View_Count": [maybe_bad(str(rng.randint(0, 10**7)), "n/a") for _ in range(rows)],
+        "PublishedAt": [maybe_bad(f"20{rng.randint(10, 24)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T"
+                                  f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}Z", "yesterday")
+                        for _ in range(rows)],
+        "Duration": [maybe_bad(duration(), "PT") for _ in range(rows)]
+    })
+
+
+def _safe_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def per_row(df):
+    # what insert_data_to_mysql used to do for every row
+    return (
+        [_safe_int(v) for v in df["View_Count"]],
+        [parse_mysql_datetime(v) for v in df["PublishedAt"]],
+        [parse_duration(v) for v in df["Duration"]]
+    )
+
+
+def vectorized(df):
+    return (
+        to_counts(df["View_Count"]),
+        to_timestamps(df["PublishedAt"]),
+        to_duration_seconds(df["Duration"])
+    )
+
+
+def best_of(func, df, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_video_frame(args.rows)
+    row_seconds = best_of(per_row, df, args.repeat)
+    vec_seconds = best_of(vectorized, df, args.repeat)
+
+    (_, bad_counts), (_, bad_dates), (_, bad_durations) = vectorized(df)
+    print(f"rows:        {args.rows}")
+    print(f"per-row:     {row_seconds:.3f}s")
+    print(f"vectorized:  {vec_seconds:.3f}s  ({row_seconds / vec_seconds:.1f}x faster)")
+    print(f"unparseable: counts={bad_counts} timestamps={bad_dates} durations={bad_durations}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Deterministic stand-in for the googleapiclient `youtube` resource, for offline benchmarks.
+
+Supports the calls api_functions makes: search, channels, playlistItems, videos and commentThreads `.list(...).execute()`,
+with nextPageToken pagination and an optional fixed latency per request. The same seed always gives the same data.
+"""
+import random
+import time
+from datetime import datetime, timedelta
+
+BASE_DATE = datetime(2020, 1, 1)
+
+
+class _Request:
+    def __init__(self, handler, params, latency):
+        self.handler = handler
+        self.params = params
+        self.latency = latency
+
+    def execute(self):
+        if self.latency:
+            time.sleep(self.latency) # stands in for the network round trip
+        return self.handler(**self.params)
+
+
+class _Resource:
+    def __init__(self, handler, latency):
+        self.handler = handler
+        self.latency = latency
+
+    def list(self, **params):
+        return _Request(self.handler, params, self.latency)
+
+
+def _page(items, page_token, page_size):
+    start = int(page_token or 0)
+    response = {"items": items[start:start + page_size]}
+    if start + page_size < len(items):
+        response["nextPageToken"] = str(start + page_size)
+    return response
+
+
+class FakeYouTube:
+    """Synthetic channels -> uploads playlists -> videos -> comment threads, sized by the constructor arguments."""
+
+    def __init__(self, channels=5, videos_per_channel=50, comments_per_video=20, latency=0.0, seed=42):
+        self.channel_ids = [f"UCfake{i:06d}" for i in range(channels)]
+        self.videos_per_channel = videos_per_channel
+        self.comments_per_video = comments_per_video
+        self.latency = latency
+        self.seed = seed
+
+    # --- synthetic data, derived from the ids so every client instance agrees ---
+
+    def _rng(self, key):
+        return random.Random(f"{self.seed}:{key}")
+
+    def _video_ids(self, channel_id):
+        return [f"{channel_id[-6:]}v{i:05d}" for i in range(self.videos_per_channel)]
+
+    def _published(self, key, newest_first_rank):
+        # newer items get smaller ranks, like the real uploads playlist and comment order
+        rng = self._rng(key)
+        return (BASE_DATE + timedelta(days=1500 - newest_first_rank * 3, seconds=rng.randint(0, 86399))).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def _video(self, video_id):
+        rng = self._rng(video_id)
+        minutes, seconds = rng.randint(0, 59), rng.randint(0, 59)
+        return {
+            "id": video_id,
+            "snippet": {
+                "title": f"Video {video_id}",
+                "description": "synthetic video " * rng.randint(1, 20),
+                "tags": [f"tag{rng.randint(0, 30)}" for _ in range(rng.randint(0, 5))],
+                "publishedAt": self._published(video_id, int(video_id[-5:])),
+                "thumbnails": {"high": {"url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"}}
+            },
+            "statistics": {
+                "viewCount": str(rng.randint(0, 10**7)),
+                "likeCount": str(rng.randint(0, 10**5)),
+                "favoriteCount": "0",
+                "commentCount": str(self.comments_per_video)
+            },
+            "contentDetails": {
+                "duration": f"PT{rng.randint(0, 2)}H{minutes}M{seconds}S",
+                "caption": rng.choice(["true", "false"])
+            }
+        }
+
+    # --- endpoint handlers ---
+
+    def _search(self, q=None, part=None, type=None, maxResults=5, pageToken=None):
+        items = [{"id": {"channelId": cid}, "snippet": {"title": cid}} for cid in self.channel_ids]
+        return _page(items, pageToken, maxResults)
+
+    def _channels(self, part=None, id=""):
+        items = []
+        for cid in id.split(","):
+            if cid not in self.channel_ids:
+                continue
+            rng = self._rng(cid)
+            items.append({
+                "id": cid,
+                "snippet": {"title": f"Channel {cid}", "description": "synthetic channel"},
+                "statistics": {"subscriberCount": str(rng.randint(0, 10**6)), "viewCount": str(rng.randint(0, 10**8))},
+                "contentDetails": {"relatedPlaylists": {"uploads": "UU" + cid[2:]}}
+            })
+        return {"items": items}
+
+    def _playlist_items(self, part=None, playlistId="", maxResults=50, pageToken=None):
+        channel_id = "UC" + playlistId[2:]
+        items = [
+            {"contentDetails": {"videoId": vid, "videoPublishedAt": self._published(vid, rank)}}
+            for rank, vid in enumerate(self._video_ids(channel_id))
+        ]
+        return _page(items, pageToken, maxResults)
+
+    def _videos(self, part=None, id=""):
+        return {"items": [self._video(vid) for vid in id.split(",") if vid]}
+
+    def _comment_threads(self, part=None, videoId="", maxResults=100, order=None, pageToken=None):
+        items = []
+        for rank in range(self.comments_per_video):
+            comment_id = f"{videoId}c{rank:05d}"
+            items.append({
+                "id": comment_id,
+                "snippet": {
+                    "videoId": videoId,
+                    "topLevelComment": {"snippet": {
+                        "textDisplay": f"comment {rank} on {videoId}",
+                        "authorDisplayName": f"user{self._rng(comment_id).randint(0, 5000)}",
+                        "publishedAt": self._published(comment_id, rank)
+                    }}
+                }
+            })
+        return _page(items, pageToken, maxResults)
+
+    # --- resource methods, same names as the real client ---
+
+    def search(self):
+        return _Resource(self._search, self.latency)
+
+    def channels(self):
+        return _Resource(self._channels, self.latency)
+
+    def playlistItems(self):
+        return _Resource(self._playlist_items, self.latency)
+
+    def videos(self):
+        return _Resource(self._videos, self.latency)
+
+    def commentThreads(self):
+        return _Resource(self._comment_threads, self.latency)
@@ -0,0 +1,113 @@
+"""Local SQLite stand-in for the MySQL warehouse, for offline benchmarks.
+
+It accepts the MySQL statements sql_migration sends: %s placeholders become ?, and
+ON DUPLICATE KEY UPDATE col = VALUES(col) becomes ON CONFLICT DO UPDATE SET col = excluded.col.
+The tables and indexes mirror schema.py. Absolute timings differ from MySQL, but runs are comparable with each other.
+"""
+import os
+import re
+import sqlite3
+
+DDL = """
+CREATE TABLE channel (
+    channel_id TEXT PRIMARY KEY, channel_name TEXT, channel_type TEXT, channel_views INTEGER NOT NULL DEFAULT 0,
+    channel_description TEXT, channel_status TEXT
+);
+CREATE TABLE playlist (
+    playlist_id TEXT PRIMARY KEY, channel_id TEXT REFERENCES channel (channel_id), playlist_name TEXT
+);
+CREATE INDEX idx_playlist_channel ON playlist (channel_id);
+CREATE TABLE video (
+    video_id TEXT PRIMARY KEY, playlist_id TEXT REFERENCES playlist (playlist_id), video_name TEXT, video_description TEXT,
+    published_date TEXT, view_count INTEGER NOT NULL DEFAULT 0, like_count INTEGER NOT NULL DEFAULT 0,
+    dislike_count INTEGER NOT NULL DEFAULT 0, favorite_count INTEGER NOT NULL DEFAULT 0,
+    comment_count INTEGER NOT NULL DEFAULT 0, duration INTEGER NOT NULL DEFAULT 0, thumbnail TEXT, caption_status TEXT
+);
+CREATE INDEX idx_video_playlist_published ON video (playlist_id, published_date);
+CREATE INDEX idx_video_views ON video (view_count);
+CREATE INDEX idx_video_likes ON video (like_count);
+CREATE TABLE comment (
+    comment_id TEXT PRIMARY KEY, video_id TEXT REFERENCES video (video_id), comment_text TEXT, comment_author TEXT,
+    comment_published_date TEXT
+);
+CREATE INDEX idx_comment_video_published ON comment (video_id, comment_published_date);
+CREATE TABLE video_rollup (
+    video_id TEXT PRIMARY KEY, channel_id TEXT, comment_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX idx_video_rollup_comments ON video_rollup (comment_count);
+CREATE INDEX idx_video_rollup_channel ON video_rollup (channel_id);
+CREATE TABLE channel_rollup (
+    channel_id TEXT PRIMARY KEY, video_count INTEGER NOT NULL DEFAULT 0, total_views INTEGER NOT NULL DEFAULT 0,
+    total_duration INTEGER NOT NULL DEFAULT 0, avg_duration REAL, comment_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX idx_channel_rollup_videos ON channel_rollup (video_count);
+CREATE TABLE warehouse_meta (id INTEGER PRIMARY KEY, generation INTEGER NOT NULL DEFAULT 0);
+INSERT INTO warehouse_meta (id, generation) VALUES (1, 0);
+"""
+
+_VALUES_REF = re.compile(r"VALUES\((\w+)\)")
+_ON_DUPLICATE = re.compile(r"ON DUPLICATE KEY UPDATE", re.IGNORECASE)
+
+
+def translate(sql):
+    """MySQL statement -> SQLite statement, for the subset of MySQL the loader and summary queries use."""
+    sql = _ON_DUPLICATE.sub("ON CONFLICT DO UPDATE SET", sql)
+    sql = _VALUES_REF.sub(r"excluded.\1", sql)
+    return sql.replace("%s", "?")
+
+
+class StandInCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    def execute(self, sql, params=()):
+        self.cursor.execute(translate(sql), tuple(params))
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return self.cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def close(self):
+        self.cursor.close()
+
+
+class StandInConnection:
+    """Looks like the mysql.connector connection that sql_migration uses, one SQLite connection per borrow."""
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path, timeout=30)
+
+    def cursor(self, **kwargs):
+        return StandInCursor(self.db.cursor())
+
+    def commit(self):
+        self.db.commit()
+
+    def rollback(self):
+        self.db.rollback()
+
+    def ping(self, **kwargs):
+        pass
+
+    def close(self):
+        self.db.close()
+
+
+def create_warehouse(path):
+    """Creates the tables in a fresh SQLite file and returns a factory for sql_migration.use_connection_factory."""
+    if os.path.exists(path):
+        os.remove(path)
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=WAL") # lets the concurrent summary queries read while nothing blocks them
+    db.executescript(DDL)
+    db.close()
+    return lambda: StandInConnection(path)
@@ -0,0 +1,497 @@
+"""Headless harvest pipeline: search -> channels -> video ids -> videos -> comments -> MySQL.
+
+Run it from a shell or cron without Streamlit, e.g.
+
+    python harvest.py --query "data science" --max-channels 5
+    python harvest.py --channel UC_x5XG1OV2P6uZZ5FSM9Ttw --incremental --every 60
+"""
+import argparse
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import metrics
+from api_functions import (
+    get_channel_ids,
+    get_channel_data,
+    iter_playlist_video_ids,
+    iter_comment_threads,
+    get_video_details,
+    get_comment_details_concurrent,
+    get_thread_client,
+    fresh_responses,
+    RequestThrottle,
+    convert_to_dataframes
+)
+from sql_migration import (
+    LOAD_ORDER,
+    get_connection,
+    load_records,
+    refresh_rollups,
+    insert_data_to_mysql,
+    get_playlist_watermarks,
+    get_comment_watermarks,
+    get_stored_videos,
+    get_hot_videos
+)
+from staging import new_run_id, require_pyarrow, stage_frames, stage_table
+
+
+@contextmanager
+def _timed(timings, stage):
+    # adds the wall time of the with-block to timings[stage] and to the process wide metrics
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        timings[stage] = round(timings.get(stage, 0) + seconds, 4)
+        metrics.add_stage_time(stage, seconds)
+
+
+def harvest_channels_parallel(channel_ids, max_workers=8, max_videos_per_channel=None, max_requests_per_second=None):
+    """Fetches channels, their video ids and video details with worker threads, returns (channel_data, playlist_data, videos).
+
+    Channel ids go out in 50-id requests, every uploads playlist is paged by its own worker, and as soon as
+    50 video ids are collected (from any playlist) they are sent to videos().list without waiting for the rest.
+    """
+    throttle = RequestThrottle(max_requests_per_second)
+    batches = [channel_ids[i:i+50] for i in range(0, len(channel_ids), 50)]
+    channel_data, playlist_data = [], []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for channels, playlists in pool.map(lambda batch: get_channel_data(batch, client=get_thread_client()), batches):
+            channel_data.extend(channels)
+            playlist_data.extend(playlists)
+
+    video_playlist_map = {}
+    pending = [] # video ids waiting until a full batch of 50 is ready
+    lock = threading.Lock()
+    detail_futures = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as detail_pool:
+        def submit(batch):
+            detail_futures.append(detail_pool.submit(
+                lambda: get_video_details(batch, video_playlist_map, client=get_thread_client())
+            ))
+
+        def walk(playlist_id):
+            pages = iter_playlist_video_ids(
+                playlist_id, max_videos=max_videos_per_channel, client=get_thread_client(), throttle=throttle
+            )
+            for ids in pages:
+                ready = []
+                with lock:
+                    for vid in ids:
+                        video_playlist_map[vid] = playlist_id # set before the batch is submitted, so the detail worker finds it
+                    pending.extend(ids)
+                    while len(pending) >= 50:
+                        ready.append(pending[:50])
+                        del pending[:50]
+                for batch in ready:
+                    submit(batch)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as playlist_pool:
+            list(playlist_pool.map(walk, [p['playlist_id'] for p in playlist_data])) # list() re-raises a worker's error here
+        if pending:
+            submit(pending) # the last, partly filled batch
+
+    videos = [video for future in detail_futures for video in future.result()]
+    return channel_data, playlist_data, videos
+
+
+def harvest_incremental(channel_ids, hot_days=7, max_comments_per_video=None, timings=None, max_videos_per_channel=None):
+    """Fetches only what changed since the last load, returns the four DataFrames plus a stats dict.
+
+    New uploads are read up to each playlist's newest stored video, statistics are refreshed only for
+    videos younger than hot_days. Comments are checked on every stored and new video of the playlists,
+    each read up to its newest stored comment, so old videos still get their new comments.
+    max_videos_per_channel caps the new uploads read per playlist, e.g. on the first run of a new channel.
+    """
+    timings = {} if timings is None else timings
+    with _timed(timings, "channels"):
+        channel_data, playlist_data = get_channel_data(channel_ids) # one cheap call, keeps subscriber/view counts current
+    playlist_ids = [p['playlist_id'] for p in playlist_data]
+
+    with _timed(timings, "video_ids"):
+        playlist_marks = get_playlist_watermarks(playlist_ids)
+        video_playlist_map = {}
+        for pid in playlist_ids:
+            for ids in iter_playlist_video_ids(pid, max_videos_per_channel, published_after=playlist_marks.get(pid)): # no watermark = new channel, read up to the cap
+                for vid in ids:
+                    video_playlist_map[vid] = pid
+        new_video_ids = list(video_playlist_map)
+
+        hot_videos = get_hot_videos(playlist_ids, hot_days)
+        for vid, pid in hot_videos.items():
+            video_playlist_map.setdefault(vid, pid)
+        video_ids = list(video_playlist_map) # new uploads + hot videos, everything older keeps its stored stats
+
+    with _timed(timings, "videos"):
+        videos = get_video_details(video_ids, video_playlist_map)
+    with _timed(timings, "comments"):
+        # the hot window only limits stats refreshes, comments can arrive on a video of any age
+        comment_video_ids = list(dict.fromkeys(new_video_ids + list(get_stored_videos(playlist_ids))))
+        comment_marks = get_comment_watermarks(comment_video_ids)
+        comments, comment_errors = get_comment_details_concurrent(
+            comment_video_ids,
+            max_comments_per_video=max_comments_per_video,
+            published_after=comment_marks
+        )
+
+    stats = {
+        "new_videos": len(new_video_ids),
+        "hot_videos_refreshed": len(set(hot_videos) - set(new_video_ids)),
+        "new_comments": len(comments),
+        "comment_videos_checked": len(comment_video_ids),
+        "comment_errors": comment_errors
+    }
+    with _timed(timings, "dataframes"):
+        frames = convert_to_dataframes(channel_data, playlist_data, videos, comments)
+    return frames, stats
+
+
+_DONE = object() # end-of-stream marker for the writer queue
+
+
+class WriterStopped(RuntimeError):
+    """Raised in the fetch workers once the streaming writer has stopped (failed, or the run was aborted)."""
+
+
+def _db_writer(batches, batch_size, result, stop, max_group=64, stage_run_id=None):
+    # single consumer: drains (table, records) items, groups what is already waiting and upserts it in
+    # LOAD_ORDER, so a video is always written before its comments even when both are in the same group.
+    # With stage_run_id every loaded group is also written as one Parquet part of that staged run.
+    conn = get_connection()
+    cursor = conn.cursor()
+    stats = {table: {"rows": 0, "seconds": 0.0, "batches": 0} for table in LOAD_ORDER}
+    parts = {table: 0 for table in LOAD_ORDER}
+    issues = {}
+    touched_videos, touched_channels = [], []
+    try:
+        finished = False
+        while not finished:
+            group = [batches.get()]
+            while len(group) < max_group:
+                try:
+                    group.append(batches.get_nowait())
+                except queue.Empty:
+                    break
+            if group[-1] is _DONE:
+                finished = True
+                group.pop()
+            for table in LOAD_ORDER:
+                records = [record for name, items in group if name == table for record in items]
+                if not records:
+                    continue
+                # keys are noted before the load, refreshing a key whose rows were rolled back is harmless
+                if table == "channel":
+                    touched_channels.extend(r['channel_id'] for r in records)
+                elif table == "video":
+                    touched_videos.extend(r['Video_Id'] for r in records)
+                elif table == "comment":
+                    touched_videos.extend(r['video_id'] for r in records)
+                table_stats, table_issues = load_records(conn, cursor, table, records, batch_size)
+                if stage_run_id:
+                    stage_table(table, pd.DataFrame(records), stage_run_id, part=parts[table])
+                    parts[table] += 1
+                stats[table]["rows"] += table_stats["rows"]
+                stats[table]["seconds"] += table_stats["seconds"]
+                stats[table]["batches"] += 1
+                for column, n in table_issues.items():
+                    issues[column] = issues.get(column, 0) + n
+                if "first_rows_at" not in result:
+                    result["first_rows_at"] = time.perf_counter()
+    except Exception as e:
+        result["error"] = e
+        stop.set() # producers blocked on a full queue give up instead of waiting forever
+    try:
+        # the groups committed before a failure are in the tables, so their rollups are refreshed either way
+        conn.rollback() # drops the uncommitted rest of a failed group, a no-op otherwise
+        result["rollups"] = refresh_rollups(conn, cursor, touched_videos, touched_channels)
+    except Exception as e:
+        result.setdefault("error", e) # the load error, if any, is the one worth reporting
+    finally:
+        cursor.close()
+        conn.close()
+    for table_stats in stats.values():
+        table_stats["seconds"] = round(table_stats["seconds"], 4)
+        table_stats["rows_per_sec"] = round(table_stats["rows"] / table_stats["seconds"], 1) if table_stats["seconds"] else None
+    result["load_stats"] = stats
+    result["unparseable_values"] = issues
+
+
+def run_streaming(channel_ids, max_workers=8, queue_size=16, batch_size=500,
+                  max_videos_per_channel=None, max_comments_per_video=None, max_requests_per_second=None, stage=False):
+    """Harvests straight into MySQL: fetch workers push record batches onto a bounded queue, one writer upserts them.
+
+    Nothing is accumulated, so memory stays at about queue_size batches, and the first rows are committed while
+    later pages are still downloading. Returns load stats per table, comment errors and timings.
+    With stage=True the writer also stages every batch it loads (see staging.py), the run id is returned as "staged".
+    """
+    if stage:
+        require_pyarrow() # fail before the writer commits anything, not after the first batch
+    started = time.perf_counter()
+    batches = queue.Queue(maxsize=queue_size) # put() blocks when the writer falls behind: that is the memory bound
+    stop = threading.Event()
+    writer_result = {}
+    stage_run_id = new_run_id() if stage else None
+    writer = threading.Thread(
+        target=_db_writer, args=(batches, batch_size, writer_result, stop), kwargs={"stage_run_id": stage_run_id}, daemon=True
+    )
+    writer.start()
+    throttle = RequestThrottle(max_requests_per_second)
+    comment_errors = []
+
+    def put(table, records):
+        while not stop.is_set():
+            try:
+                batches.put((table, records), timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise WriterStopped(f"database writer stopped: {writer_result.get('error')}")
+
+    try:
+        channel_data, playlist_data = get_channel_data(channel_ids)
+        put("channel", channel_data)
+        put("playlist", playlist_data)
+        video_playlist_map = {} # filled per playlist page below
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = deque() # jobs submit follow-up jobs, so this grows while we drain it
+
+            def fetch_comments(video_id):
+                try:
+                    for page in iter_comment_threads(video_id, max_comments_per_video, client=get_thread_client(), throttle=throttle):
+                        put("comment", page)
+                except WriterStopped:
+                    raise
+                except Exception as e:
+                    comment_errors.append({"video_id": video_id, "error": str(e)})
+
+            def fetch_videos(ids):
+                videos = get_video_details(ids, video_playlist_map, client=get_thread_client())
+                put("video", videos) # queued before any of its comments, the writer keeps that order
+                for video in videos:
+                    futures.append(pool.submit(fetch_comments, video['Video_Id']))
+
+            def walk(playlist_id):
+                for ids in iter_playlist_video_ids(playlist_id, max_videos_per_channel, client=get_thread_client(), throttle=throttle):
+                    for vid in ids:
+                        video_playlist_map[vid] = playlist_id
+                    futures.append(pool.submit(fetch_videos, ids)) # a playlist page is 50 ids, exactly one videos() request
+
+            for p in playlist_data:
+                futures.append(pool.submit(walk, p['playlist_id']))
+            try:
+                while futures:
+                    futures.popleft().result() # a job's follow-ups are queued before it finishes, so empty means all done
+            except BaseException:
+                stop.set() # running jobs stop at their next put(), queued ones are dropped
+                pool.shutdown(cancel_futures=True)
+                raise
+    finally:
+        while writer.is_alive(): # tell the writer to finish, unless it already died
+            try:
+                batches.put(_DONE, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        writer.join()
+
+    if "error" in writer_result:
+        raise writer_result["error"]
+    first_rows = writer_result.get("first_rows_at")
+    return {
+        "load_stats": writer_result["load_stats"],
+        "rollups": writer_result.get("rollups"),
+        "unparseable_values": writer_result["unparseable_values"],
+        "comment_errors": comment_errors,
+        "staged": stage_run_id,
+        "timings": {
+            "first_rows_committed": round(first_rows - started, 4) if first_rows else None,
+            "total": round(time.perf_counter() - started, 4)
+        }
+    }
+
+
+def run_pipeline(channel_ids=None, query=None, max_channels=10, max_videos_per_channel=None,
+                 max_comments_per_video=None, incremental=False, hot_days=7, load=True, batch_size=500, max_workers=8,
+                 stream=False, stage=False, refresh=False):
+    """Runs the whole harvest for explicit channel ids and/or a search query.
+
+    Returns a dict with the four DataFrames ("frames"), per-stage wall times in seconds ("timings"),
+    comment fetch errors, incremental stats and, when load is True, the per-table load stats.
+    With stream=True the data goes straight into MySQL through run_streaming and no frames are kept.
+    With stage=True the run is also written to Parquet (staging.py) and "staged" holds its run id and row counts.
+    With refresh=True no API response is taken from the on-disk cache, the fresh ones replace the cached entries.
+    """
+    if refresh:
+        with fresh_responses():
+            return run_pipeline(channel_ids, query, max_channels, max_videos_per_channel, max_comments_per_video,
+                                incremental, hot_days, load, batch_size, max_workers, stream, stage)
+    if stage:
+        require_pyarrow() # before any API call or load, so a missing pyarrow costs no quota and leaves no partial run
+    timings = {}
+    channel_ids = list(channel_ids or [])
+    if query:
+        with _timed(timings, "search"):
+            channel_ids += [cid for cid in get_channel_ids(query, max_channels) if cid not in channel_ids]
+
+    if stream:
+        result = run_streaming(
+            channel_ids, max_workers=max_workers, batch_size=batch_size,
+            max_videos_per_channel=max_videos_per_channel, max_comments_per_video=max_comments_per_video, stage=stage
+        )
+        result["timings"] = {**timings, **result["timings"]}
+        result["channel_ids"] = channel_ids
+        return result
+
+    result = {"channel_ids": channel_ids, "timings": timings, "comment_errors": [], "delta": None, "load_stats": None, "staged": None}
+    if incremental:
+        frames, delta = harvest_incremental(channel_ids, hot_days, max_comments_per_video, timings, max_videos_per_channel)
+        result["comment_errors"] = delta.pop("comment_errors")
+        result["delta"] = delta
+    else:
+        with _timed(timings, "channels_and_videos"): # one stage: video details are fetched while playlists are still paging
+            channel_data, playlist_data, videos = harvest_channels_parallel(
+                channel_ids, max_workers=max_workers, max_videos_per_channel=max_videos_per_channel
+            )
+        with _timed(timings, "comments"):
+            comments, result["comment_errors"] = get_comment_details_concurrent(
+                [video['Video_Id'] for video in videos], max_workers=max_workers, max_comments_per_video=max_comments_per_video
+            )
+        with _timed(timings, "dataframes"):
+            frames = convert_to_dataframes(channel_data, playlist_data, videos, comments)
+    result["frames"] = frames
+
+    if stage: # before the load, so a failed load can be replayed from the files
+        with _timed(timings, "stage"):
+            result["staged"] = stage_frames(frames)
+    if load:
+        with _timed(timings, "load"):
+            result["load_stats"] = insert_data_to_mysql(*frames, batch_size=batch_size)
+    return result
+
+
+def _next_run(now, every_minutes=None, daily_at=None):
+    # next start time for a fixed interval ("every 60 minutes") or a fixed time of day ("02:30")
+    if daily_at:
+        hour, minute = (int(part) for part in daily_at.split(":"))
+        candidate = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return candidate if candidate > now else candidate + timedelta(days=1)
+    return now + timedelta(minutes=every_minutes)
+
+
+def schedule_pipeline(every_minutes=None, daily_at=None, runs=None, on_result=None, **pipeline_kwargs):
+    """Calls run_pipeline on a schedule until runs is reached (forever when None).
+
+    A failing run is reported through on_result and does not stop the schedule.
+    """
+    count = 0
+    while runs is None or count < runs:
+        if daily_at and count == 0:
+            time.sleep(max(0, (_next_run(datetime.now(), daily_at=daily_at) - datetime.now()).total_seconds()))
+        started = datetime.now()
+        try:
+            outcome = run_pipeline(**pipeline_kwargs)
+        except Exception as e:
+            outcome = {"error": str(e)}
+        outcome["started_at"] = started.isoformat(timespec="seconds")
+        if on_result:
+            on_result(outcome)
+        count += 1
+        if runs is not None and count >= runs:
+            break
+        wait = (_next_run(started, every_minutes, daily_at) - datetime.now()).total_seconds()
+        time.sleep(max(0, wait)) # a run longer than the interval starts the next one right away
+
+
+def _report(result):
+    # the JSON-friendly part of a result: everything except the DataFrames
+    report = {key: value for key, value in result.items() if key != "frames"}
+    if "frames" in result:
+        report["rows"] = {name: len(df) for name, df in zip(("channel", "playlist", "video", "comment"), result["frames"])}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Harvest YouTube channels into the MySQL warehouse.")
+    parser.add_argument("--channel", action="append", default=[], help="channel id, can be repeated")
+    parser.add_argument("--query", help="search query used to find channels")
+    parser.add_argument("--max-channels", type=int, default=10)
+    parser.add_argument("--max-videos", type=int, help="cap on videos per channel")
+    parser.add_argument("--max-comments", type=int, default=100, help="cap on comments per video")
+    parser.add_argument("--incremental", action="store_true", help="only fetch what changed since the last load")
+    parser.add_argument("--hot-days", type=int, default=7)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=8, help="parallel API requests")
+    parser.add_argument("--no-load", action="store_true", help="fetch only, do not write to MySQL")
+    parser.add_argument("--stream", action="store_true", help="write batches to MySQL while still fetching, bounded memory")
+    parser.add_argument("--refresh", action="store_true", help="ignore cached API responses, fetch everything fresh")
+    parser.add_argument("--stage", action="store_true", help="also write the run to Parquet under YT_STAGING_DIR (needs pyarrow)")
+    parser.add_argument("--every", type=float, metavar="MINUTES", help="repeat every N minutes")
+    parser.add_argument("--at", metavar="HH:MM", help="run once a day at this local time")
+    parser.add_argument("--runs", type=int, help="stop the schedule after this many runs")
+    parser.add_argument("--report", metavar="PATH", help="append one JSON line per run to this file")
+    parser.add_argument("--metrics", metavar="PATH", help="append the run's metrics (stages, API, inserts) as a JSON line")
+    parser.add_argument("--profile", metavar="PATH", help="profile a single run with cProfile and dump the stats here")
+    parser.add_argument("--log-file", metavar="PATH", help="write structured JSON log lines (stages, inserts, queries) here")
+    args = parser.parse_args(argv)
+    if args.log_file:
+        logging.basicConfig(filename=args.log_file, level=logging.INFO, format="%(message)s")
+
+    if not args.channel and not args.query:
+        parser.error("give at least one --channel or a --query")
+    if args.stream and (args.no_load or args.incremental):
+        parser.error("--stream always loads and does not support --incremental")
+
+    def on_result(result):
+        result["metrics"] = metrics.snapshot()
+        if args.metrics:
+            metrics.write_json(args.metrics)
+        metrics.reset() # the next scheduled run starts from zero
+        line = json.dumps(_report(result), default=str)
+        print(line)
+        if args.report:
+            with open(args.report, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    pipeline_kwargs = dict(
+        channel_ids=args.channel,
+        query=args.query,
+        max_channels=args.max_channels,
+        max_videos_per_channel=args.max_videos,
+        max_comments_per_video=args.max_comments,
+        incremental=args.incremental,
+        hot_days=args.hot_days,
+        load=not args.no_load,
+        batch_size=args.batch_size,
+        max_workers=args.workers,
+        stream=args.stream,
+        stage=args.stage,
+        refresh=args.refresh
+    )
+    if args.profile:
+        if args.every or args.at:
+            parser.error("--profile runs the pipeline once, it cannot be combined with --every/--at")
+        result, top = metrics.profile_run(run_pipeline, profile_path=args.profile, **pipeline_kwargs)
+        print(top, file=sys.stderr)
+        on_result(result)
+    elif args.every or args.at:
+        schedule_pipeline(every_minutes=args.every, daily_at=args.at, runs=args.runs, on_result=on_result, **pipeline_kwargs)
+    else:
+        on_result(run_pipeline(**pipeline_kwargs))
+
+
+if __name__ == "__main__":
+    main()
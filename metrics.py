@@ -0,0 +1,113 @@
+"""Process wide pipeline metrics: stage wall times, API calls and quota per endpoint, insert rates, query latency.
+
+Everything is kept in memory (thread safe) until snapshot() / write_json() is called.
+"""
+import cProfile
+import io
+import json
+import logging
+import pstats
+import threading
+from datetime import datetime
+
+logger = logging.getLogger("youtube_harvest.metrics")
+
+_lock = threading.Lock()
+_metrics = None
+
+
+def reset():
+    """Starts a fresh set of metrics, e.g. at the beginning of a harvest run."""
+    global _metrics
+    with _lock:
+        _metrics = {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "stages": {},   # stage -> {"seconds", "runs"}
+            "api": {},      # endpoint -> {"calls", "cache_hits", "retries", "quota_units"}
+            "inserts": {},  # table -> {"rows", "seconds", "rows_per_sec"}
+            "queries": {}   # query key -> {"runs", "cache_hits", "last_seconds", "total_seconds", "rows"}
+        }
+
+
+reset()
+
+
+def add_stage_time(name, seconds):
+    with _lock:
+        entry = _metrics["stages"].setdefault(name, {"seconds": 0.0, "runs": 0})
+        entry["seconds"] = round(entry["seconds"] + seconds, 4)
+        entry["runs"] += 1
+    logger.info(json.dumps({"event": "stage", "stage": name, "seconds": round(seconds, 4)}))
+
+
+def _api_entry(endpoint):
+    return _metrics["api"].setdefault(endpoint, {"calls": 0, "cache_hits": 0, "retries": 0, "quota_units": 0})
+
+
+def record_api_call(endpoint, cached=False):
+    with _lock:
+        entry = _api_entry(endpoint)
+        if cached:
+            entry["cache_hits"] += 1
+        else:
+            entry["calls"] += 1
+
+
+def record_quota(endpoint, units):
+    # called where QuotaBudget charges, so retried and failed attempts are counted like the quota counter counts them
+    with _lock:
+        _api_entry(endpoint)["quota_units"] += units
+
+
+def record_api_retry(endpoint):
+    with _lock:
+        _api_entry(endpoint)["retries"] += 1
+
+
+def record_insert(table, rows, seconds):
+    with _lock:
+        entry = _metrics["inserts"].setdefault(table, {"rows": 0, "seconds": 0.0, "rows_per_sec": None})
+        entry["rows"] += rows
+        entry["seconds"] = round(entry["seconds"] + seconds, 4)
+        entry["rows_per_sec"] = round(entry["rows"] / entry["seconds"], 1) if entry["seconds"] else None
+    logger.info(json.dumps({"event": "insert", "table": table, "rows": rows, "seconds": round(seconds, 4)}))
+
+
+def record_query(key, seconds, rows, cached=False):
+    with _lock:
+        entry = _metrics["queries"].setdefault(key, {"runs": 0, "cache_hits": 0, "last_seconds": 0.0, "total_seconds": 0.0, "rows": 0})
+        if cached:
+            entry["cache_hits"] += 1
+        else:
+            entry["runs"] += 1
+            entry["last_seconds"] = round(seconds, 4)
+            entry["total_seconds"] = round(entry["total_seconds"] + seconds, 4)
+        entry["rows"] = rows
+    logger.info(json.dumps({"event": "query", "query": key, "seconds": round(seconds, 4), "rows": rows, "cached": cached}))
+
+
+def snapshot():
+    """Returns a deep copy of the current metrics, safe to serialize or display."""
+    with _lock:
+        return json.loads(json.dumps(_metrics))
+
+
+def write_json(path):
+    """Appends the current metrics as one JSON line to path."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(snapshot()) + "\n")
+
+
+def profile_run(func, *args, profile_path=None, top=30, **kwargs):
+    """Runs func(*args, **kwargs) under cProfile, returns (result, text of the top functions by cumulative time).
+
+    The raw profile is also dumped to profile_path when given (open it with snakeviz or pstats).
+    Only the calling thread is profiled, time spent in worker threads shows up as waiting on their futures.
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    if profile_path:
+        profiler.dump_stats(profile_path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+    return result, out.getvalue()
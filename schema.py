@@ -0,0 +1,237 @@
+"""Versioned warehouse schema for the youtubedataharvesting database.
+
+Run `python schema.py` to apply pending migrations and print the EXPLAIN check of the ten summary queries.
+"""
+import sys
+
+from sql_migration import get_connection, QUERY_MAP, VIDEO_ROLLUP_SQL, CHANNEL_ROLLUP_SQL
+
+def add_index(table, name, columns):
+    # guarded step: skipped when the index already exists, so a migration that failed halfway can be run again
+    return ("index", table, name, f"ALTER TABLE {table} ADD INDEX {name} ({columns})")
+
+
+def add_foreign_key(table, name, definition):
+    return ("constraint", table, name, f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+
+
+# (version, description, statements). Applied in order, each version exactly once, tracked in schema_version.
+# MySQL commits every DDL statement on its own, so each statement must be safe to run again: plain SQL that is
+# idempotent by itself (MODIFY, CREATE TABLE IF NOT EXISTS, upserts), or an add_index / add_foreign_key step.
+# Version 1 only creates the tables, so a database whose tables were created by hand is left as it is,
+# version 2 then brings both kinds of database to the same typed, indexed layout.
+MIGRATIONS = [
+    (1, "create tables", [
+        """
+        CREATE TABLE IF NOT EXISTS channel (
+            channel_id VARCHAR(64) NOT NULL PRIMARY KEY,
+            channel_name VARCHAR(255),
+            channel_type VARCHAR(64),
+            channel_views BIGINT UNSIGNED,
+            channel_description TEXT,
+            channel_status VARCHAR(32)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS playlist (
+            playlist_id VARCHAR(64) NOT NULL PRIMARY KEY,
+            channel_id VARCHAR(64),
+            playlist_name VARCHAR(255)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS video (
+            video_id VARCHAR(32) NOT NULL PRIMARY KEY,
+            playlist_id VARCHAR(64),
+            video_name VARCHAR(255),
+            video_description TEXT,
+            published_date DATETIME,
+            view_count BIGINT UNSIGNED,
+            like_count INT UNSIGNED,
+            dislike_count INT UNSIGNED,
+            favorite_count INT UNSIGNED,
+            comment_count INT UNSIGNED,
+            duration INT UNSIGNED,
+            thumbnail VARCHAR(255),
+            caption_status VARCHAR(16)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS comment (
+            comment_id VARCHAR(64) NOT NULL PRIMARY KEY,
+            video_id VARCHAR(32),
+            comment_text TEXT,
+            comment_author VARCHAR(255),
+            comment_published_date DATETIME
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """
+    ]),
+    (2, "typed columns, foreign keys and indexes for the summary queries", [
+        # compact integer / datetime types: counts are never negative, duration is stored in seconds
+        """
+        ALTER TABLE channel
+            MODIFY channel_views BIGINT UNSIGNED NOT NULL DEFAULT 0
+        """,
+        """
+        ALTER TABLE video
+            MODIFY published_date DATETIME,
+            MODIFY view_count BIGINT UNSIGNED NOT NULL DEFAULT 0,
+            MODIFY like_count INT UNSIGNED NOT NULL DEFAULT 0,
+            MODIFY dislike_count INT UNSIGNED NOT NULL DEFAULT 0,
+            MODIFY favorite_count INT UNSIGNED NOT NULL DEFAULT 0,
+            MODIFY comment_count INT UNSIGNED NOT NULL DEFAULT 0,
+            MODIFY duration INT UNSIGNED NOT NULL DEFAULT 0
+        """,
+        # channel -> playlist join (queries 1, 2, 3, 5, 7, 8, 9, 10)
+        add_index("playlist", "idx_playlist_channel", "channel_id"),
+        add_foreign_key("playlist", "fk_playlist_channel",
+                        "FOREIGN KEY (channel_id) REFERENCES channel (channel_id) ON DELETE CASCADE"),
+        # playlist -> video join, plus the published_date range of query 8 and the incremental watermarks,
+        # top-N by views / likes (queries 3 and 5)
+        add_index("video", "idx_video_playlist_published", "playlist_id, published_date"),
+        add_index("video", "idx_video_views", "view_count"),
+        add_index("video", "idx_video_likes", "like_count"),
+        add_foreign_key("video", "fk_video_playlist",
+                        "FOREIGN KEY (playlist_id) REFERENCES playlist (playlist_id) ON DELETE CASCADE"),
+        # video -> comment join and COUNT per video (queries 4 and 10), newest comment per video (watermarks)
+        add_index("comment", "idx_comment_video_published", "video_id, comment_published_date"),
+        add_foreign_key("comment", "fk_comment_video",
+                        "FOREIGN KEY (video_id) REFERENCES video (video_id) ON DELETE CASCADE")
+    ]),
+    (3, "per-channel and per-video rollup tables", [
+        # kept current by sql_migration.refresh_rollups after every load, read by queries 2, 4, 7, 9 and 10
+        """
+        CREATE TABLE IF NOT EXISTS video_rollup (
+            video_id VARCHAR(32) NOT NULL PRIMARY KEY,
+            channel_id VARCHAR(64),
+            comment_count INT UNSIGNED NOT NULL DEFAULT 0,
+            INDEX idx_video_rollup_comments (comment_count),
+            INDEX idx_video_rollup_channel (channel_id),
+            CONSTRAINT fk_video_rollup_video FOREIGN KEY (video_id) REFERENCES video (video_id) ON DELETE CASCADE
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS channel_rollup (
+            channel_id VARCHAR(64) NOT NULL PRIMARY KEY,
+            video_count INT UNSIGNED NOT NULL DEFAULT 0,
+            total_views BIGINT UNSIGNED NOT NULL DEFAULT 0,
+            total_duration BIGINT UNSIGNED NOT NULL DEFAULT 0,
+            avg_duration DECIMAL(12, 4),
+            comment_count BIGINT UNSIGNED NOT NULL DEFAULT 0,
+            INDEX idx_channel_rollup_videos (video_count),
+            CONSTRAINT fk_channel_rollup_channel FOREIGN KEY (channel_id) REFERENCES channel (channel_id) ON DELETE CASCADE
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        # backfill from the rows already in the warehouse
+        VIDEO_ROLLUP_SQL.format(where=""),
+        CHANNEL_ROLLUP_SQL.format(where="")
+    ]),
+    (4, "warehouse generation counter", [
+        # one row, bumped by sql_migration.commit_load with every committed load; cached query results are keyed by it
+        """
+        CREATE TABLE IF NOT EXISTS warehouse_meta (
+            id TINYINT UNSIGNED NOT NULL PRIMARY KEY,
+            generation BIGINT UNSIGNED NOT NULL DEFAULT 0
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """,
+        "INSERT IGNORE INTO warehouse_meta (id, generation) VALUES (1, 0)"
+    ])
+]
+
+# query 6 lists every video from a single table, a full scan is the right plan for it
+FULL_SCAN_EXPECTED = {
+    "6. What is the total number of likes and dislikes for each video, and what are their corresponding video names?"
+}
+
+
+def current_version(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT NOT NULL PRIMARY KEY,
+            description VARCHAR(255),
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+
+def _step_done(cursor, kind, table, name):
+    if kind == "index":
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """, (table, name))
+    else:
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.table_constraints
+            WHERE table_schema = DATABASE() AND table_name = %s AND constraint_name = %s
+        """, (table, name))
+    return cursor.fetchone()[0] > 0
+
+
+def migrate(target=None):
+    """Applies every migration newer than the stored version (up to target), returns the versions applied."""
+    conn = get_connection()
+    cursor = conn.cursor()
+    applied = []
+    try:
+        version = current_version(cursor)
+        for number, description, statements in MIGRATIONS:
+            if number <= version or (target is not None and number > target):
+                continue
+            # a migration is recorded only after all its statements ran; if one fails, the next run repeats
+            # the migration and the guarded steps that already went through are skipped
+            for statement in statements:
+                if isinstance(statement, tuple):
+                    kind, table, name, statement = statement
+                    if _step_done(cursor, kind, table, name):
+                        continue
+                cursor.execute(statement)
+            cursor.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)", (number, description))
+            conn.commit()
+            applied.append(number)
+    finally:
+        cursor.close()
+        conn.close()
+    return applied
+
+
+def explain_queries():
+    """Runs EXPLAIN on every summary query and returns {question: {"ok": bool, "plan": [...], "problems": [...]}}.
+
+    A query passes when every table it joins is reached through an index. The driving (first) table may be
+    scanned, e.g. the small channel table, but then at least one later step must use an index.
+    """
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    report = {}
+    try:
+        for question, sql in QUERY_MAP.items():
+            cursor.execute("EXPLAIN " + sql.strip().rstrip(";"))
+            plan = [
+                {"table": row["table"], "type": row["type"], "key": row["key"], "rows": row["rows"], "extra": row["Extra"]}
+                for row in cursor.fetchall()
+            ]
+            problems = []
+            for position, step in enumerate(plan):
+                # <derived..>/<subquery..> are temporary tables, the driving table is allowed to be scanned
+                if position > 0 and step["key"] is None and not step["table"].startswith("<"):
+                    problems.append(f"full scan of {step['table']}")
+            if all(step["key"] is None for step in plan) and question not in FULL_SCAN_EXPECTED:
+                problems.append("no index used")
+            report[question] = {"ok": not problems, "plan": plan, "problems": problems}
+    finally:
+        cursor.close()
+        conn.close()
+    return report
+
+
+if __name__ == "__main__":
+    print(f"applied migrations: {migrate() or 'none, schema is current'}")
+    failures = 0
+    for question, result in explain_queries().items():
+        status = "ok" if result["ok"] else "NO INDEX: " + ", ".join(result["problems"])
+        print(f"{question[:60]:<60} {status}")
+        failures += not result["ok"]
+    sys.exit(1 if failures else 0)
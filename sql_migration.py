@@ -1,7 +1,76 @@
 import mysql.connector
+from mysql.connector import pooling
 import isodate
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
 from datetime import datetime
 
+import metrics
+from transform import normalize_channel_df, normalize_video_df, normalize_comment_df
+
+# connection settings come from the environment so credentials are not hard-coded, defaults match the local dev server
+DB_CONFIG = {
+    "host": os.environ.get("MYSQL_HOST", "localhost"),
+    "port": int(os.environ.get("MYSQL_PORT", 3306)),
+    "user": os.environ.get("MYSQL_USER", "root"),
+    "password": os.environ.get("MYSQL_PASSWORD", "root"),
+    "database": os.environ.get("MYSQL_DATABASE", "youtubedataharvesting")
+}
+POOL_SIZE = int(os.environ.get("MYSQL_POOL_SIZE", 5))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_connection_pool(pool_size=None):
+    """Returns the module wide connection pool, creating it on first use."""
+    global _pool
+    with _pool_lock: # two threads must not both create a pool
+        if _pool is None:
+            _pool = pooling.MySQLConnectionPool(
+                pool_name="youtube_pool",
+                pool_size=pool_size or POOL_SIZE,
+                pool_reset_session=True,
+                **DB_CONFIG
+            )
+    return _pool
+
+
+_connection_factory = None
+
+
+def use_connection_factory(factory):
+    """Makes get_connection return factory() instead of a pooled MySQL connection (None restores the pool).
+
+    Used by the offline benchmarks to run the loader and queries against a local stand-in database.
+    """
+    global _connection_factory
+    _connection_factory = factory
+
+
+def get_connection(timeout=10):
+    """Borrows a healthy connection from the pool, close() hands it back."""
+    if _connection_factory is not None:
+        return _connection_factory()
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            conn = get_connection_pool().get_connection()
+            break
+        except mysql.connector.errors.PoolError: # every connection is lent out, wait for one to come back
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+    # health check: the server drops idle connections (wait_timeout), ping reconnects a stale one before we use it
+    conn.ping(reconnect=True, attempts=3, delay=1)
+    return conn
+
+
 def parse_duration(duration_str):
     try:
         duration = isodate.parse_duration(duration_str)
@@ -15,202 +84,606 @@ def parse_mysql_datetime(dt_str):
     except Exception:
         return None
 
-def insert_data_to_mysql(channel_df, playlist_df, video_df, comment_df):
-    conn = mysql.connector.connect(
-        host='localhost',
-        user='root',
-        password='root',
-        database='youtubedataharvesting'
+def _column(df, name, default=None):
+    # whole column as a plain python list, or the default repeated when the column is missing
+    if name in df.columns:
+        return df[name].tolist()
+    return [default] * len(df)
+
+
+def _int_column(df, name):
+    # counts arrive as strings from the API, convert the whole column at once into python ints
+    if name not in df.columns:
+        return [0] * len(df)
+    return pd.to_numeric(df[name], errors='coerce').fillna(0).astype('int64').tolist()
+
+
+def _datetime_column(df, name):
+    # datetime64 column -> python datetimes with None for NaT, which is what the connector expects
+    if name not in df.columns:
+        return [None] * len(df)
+    values = np.array(df[name].dt.to_pydatetime(), dtype=object)
+    values[df[name].isna().to_numpy()] = None
+    return values.tolist()
+
+
+def channel_rows(channel_df):
+    # expects the frame from transform.normalize_channel_df: typed Subscription_Count
+    return list(zip(
+        _column(channel_df, 'channel_id'),
+        _column(channel_df, 'channel_Name'),
+        _column(channel_df, 'channel_type', 'N/A'),
+        _int_column(channel_df, 'Subscription_Count'),
+        _column(channel_df, 'Channel_Description', ''),
+        _column(channel_df, 'channel_status', 'active')
+    ))
+
+
+def playlist_rows(playlist_df):
+    return list(zip(
+        _column(playlist_df, 'playlist_id'),
+        _column(playlist_df, 'channel_id'),
+        _column(playlist_df, 'playlist_name')
+    ))
+
+
+def video_rows(video_df):
+    # expects the frame from transform.normalize_video_df: typed counts, datetime PublishedAt, Duration in seconds
+    return list(zip(
+        _column(video_df, 'Video_Id'),
+        _column(video_df, 'playlist_id'),
+        _column(video_df, 'Video_Name'),
+        _column(video_df, 'Video_Description'),
+        _datetime_column(video_df, 'PublishedAt'),
+        _int_column(video_df, 'View_Count'),
+        _int_column(video_df, 'Like_Count'),
+        _int_column(video_df, 'Dislike_Count'),
+        _int_column(video_df, 'Favorite_Count'),
+        _int_column(video_df, 'Comment_Count'),
+        _int_column(video_df, 'Duration'),
+        _column(video_df, 'Thumbnail'),
+        _column(video_df, 'Caption_Status')
+    ))
+
+
+def comment_rows(comment_df):
+    # expects the frame from transform.normalize_comment_df
+    return list(zip(
+        _column(comment_df, 'Comment_Id'),
+        _column(comment_df, 'video_id'),
+        _column(comment_df, 'Comment_Text'),
+        _column(comment_df, 'Comment_Author'),
+        _datetime_column(comment_df, 'Comment_PublishedAt')
+    ))
+
+
+# table -> (insert columns, columns refreshed on duplicate key)
+#DUPLICATE KEY UPDATE If a row with the same key already exists (primary or unique key conflict), it updates the existing row instead of inserting a new one.
+UPSERT_SPECS = {
+    "channel": (
+        ["channel_id", "channel_name", "channel_type", "channel_views", "channel_description", "channel_status"],
+        ["channel_name", "channel_type", "channel_views", "channel_description", "channel_status"]
+    ),
+    "playlist": (
+        ["playlist_id", "channel_id", "playlist_name"],
+        ["playlist_name"]
+    ),
+    "video": (
+        ["video_id", "playlist_id", "video_name", "video_description", "published_date",
+         "view_count", "like_count", "dislike_count", "favorite_count", "comment_count",
+         "duration", "thumbnail", "caption_status"],
+        ["video_name", "video_description", "view_count", "like_count", "favorite_count",
+         "comment_count", "duration", "thumbnail", "caption_status"]
+    ),
+    "comment": (
+        ["comment_id", "video_id", "comment_text", "comment_author", "comment_published_date"],
+        ["comment_text", "comment_author", "comment_published_date"]
     )
-    cursor = conn.cursor()
+}
 
-    # Insert into channel
-    #_ is a placeholder meaning “ignore the index.”,row is a Series representing one row of data (with column names as keys).
-    #DUPLICATE KEY UPDATE If a row with the same channel_id already exists (primary or unique key conflict), it updates the existing row instead of inserting a      new one.
-    for _, row in channel_df.iterrows(): 
-        cursor.execute("""
-            INSERT INTO channel (channel_id, channel_name, channel_type, channel_views, channel_description, channel_status)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                channel_name = VALUES(channel_name),
-                channel_type = VALUES(channel_type),
-                channel_views = VALUES(channel_views),
-                channel_description = VALUES(channel_description),
-                channel_status = VALUES(channel_status)
-        """, (
-            row['channel_id'],
-            row['channel_Name'],
-            row.get('channel_type', 'N/A'),
-            int(row.get('Subscription_Count', 0)),
-            row.get('Channel_Description', ''),
-            row.get('channel_status', 'active')
-        ))
-
-    # Insert into playlist
-    for _, row in playlist_df.iterrows():
-        cursor.execute("""
-            INSERT INTO playlist (playlist_id, channel_id, playlist_name)
-            VALUES (%s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                playlist_name = VALUES(playlist_name)
-        """, (
-            row['playlist_id'],
-            row['channel_id'],
-            row['playlist_name']
-        ))
-
-    # Insert into video
-    for _, row in video_df.iterrows():
-        cursor.execute("""
-            INSERT INTO video (
-                video_id, playlist_id, video_name, video_description, published_date,
-                view_count, like_count, dislike_count, favorite_count, comment_count,
-                duration, thumbnail, caption_status
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE 
-                video_name = VALUES(video_name),
-                video_description = VALUES(video_description),
-                view_count = VALUES(view_count),
-                like_count = VALUES(like_count),
-                favorite_count = VALUES(favorite_count),
-                comment_count = VALUES(comment_count),
-                duration = VALUES(duration),
-                thumbnail = VALUES(thumbnail),
-                caption_status = VALUES(caption_status)
-        """, (
-            row['Video_Id'],
-            row.get('playlist_id', None),
-            row['Video_Name'],
-            row['Video_Description'],
-            parse_mysql_datetime(row['PublishedAt']),
-            int(row.get('View_Count', 0)),
-            int(row.get('Like_Count', 0)),
-            int(row.get('Dislike_Count', 0)) if 'Dislike_Count' in row else 0,
-            int(row.get('Favorite_Count', 0)),
-            int(row.get('Comment_Count', 0)),
-            parse_duration(row['Duration']),
-            row['Thumbnail'],
-            row['Caption_Status']
-        ))
-
-    # Insert into comment
-    for _, row in comment_df.iterrows():
-        cursor.execute("""
-            INSERT INTO comment (
-                comment_id, video_id, comment_text, comment_author, comment_published_date
-            )
-            VALUES (%s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                comment_text = VALUES(comment_text),
-                comment_author = VALUES(comment_author),
-                comment_published_date = VALUES(comment_published_date)
-        """, (
-            row['Comment_Id'],
-            row.get('video_id', None),
-            row['Comment_Text'],
-            row['Comment_Author'],
-            parse_mysql_datetime(row['Comment_PublishedAt'])
-        ))
 
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-def get_channel_summary(selection):
-    conn = mysql.connector.connect(
-        host='localhost',
-        user='root',
-        password='root',
-        database='youtubedataharvesting'
+def _upsert_sql(table, row_count):
+    columns, update_columns = UPSERT_SPECS[table]
+    placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES {', '.join([placeholders] * row_count)} "
+        "ON DUPLICATE KEY UPDATE " + ", ".join(f"{c} = VALUES({c})" for c in update_columns)
     )
-    cursor = conn.cursor()
 
-    # Add all queries here
-    query_map = {
-        "1. What are the names of all the videos and their corresponding channels?": """
-            SELECT c.channel_name, v.video_name
-            FROM channel c
-            LEFT JOIN playlist p ON c.channel_id = p.channel_id
-            LEFT JOIN video v ON p.playlist_id = v.playlist_id;
-        """,
-        "2. Which channels have the most number of videos, and how many videos do they have?": """
-            SELECT c.channel_name, COUNT(v.video_id) AS video_count
-            FROM channel c
-            LEFT JOIN playlist p ON c.channel_id = p.channel_id
-            LEFT JOIN video v ON p.playlist_id = v.playlist_id
-            GROUP BY c.channel_id
-            ORDER BY video_count DESC
-            LIMIT 1;
-        """,
-        "3. What are the top 10 most viewed videos and their respective channels?": """
-            SELECT c.channel_name, v.video_name, v.view_count
-            FROM channel c
-            JOIN playlist p ON c.channel_id = p.channel_id
-            JOIN video v ON p.playlist_id = v.playlist_id
-            ORDER BY v.view_count DESC
-            LIMIT 10;
-        """,
-        "4. How many comments were made on each video, and what are their corresponding video names?": """
-            SELECT v.video_name, COUNT(cm.comment_id) AS comment_count
-            FROM video v
-            LEFT JOIN comment cm ON v.video_id = cm.video_id
-            GROUP BY v.video_id;
-        """,
-        "5. Which videos have the highest number of likes, and what are their corresponding channel names?": """
-            SELECT c.channel_name, v.video_name, v.like_count
-            FROM channel c
-            JOIN playlist p ON c.channel_id = p.channel_id
-            JOIN video v ON p.playlist_id = v.playlist_id
-            ORDER BY v.like_count DESC
-            LIMIT 1;
-        """,
-        "6. What is the total number of likes and dislikes for each video, and what are their corresponding video names?": """
-            SELECT video_name, like_count, dislike_count
-            FROM video;
-        """,
-        "7. What is the total number of views for each channel, and what are their corresponding channel names?": """
-            SELECT c.channel_name, SUM(v.view_count) AS total_views
-            FROM channel c
-            JOIN playlist p ON c.channel_id = p.channel_id
-            JOIN video v ON p.playlist_id = v.playlist_id
-            GROUP BY c.channel_id;
-        """,
-        "8. What are the names of all the channels that have published videos in the year 2022?": """
-            SELECT DISTINCT c.channel_name
-            FROM channel c
-            JOIN playlist p ON c.channel_id = p.channel_id
-            JOIN video v ON p.playlist_id = v.playlist_id
-            WHERE YEAR(v.published_date) = 2022;
-        """,
-        "9. What is the average duration of all videos in each channel, and what are their corresponding channel names?": """
-            SELECT c.channel_name, AVG(v.duration) AS avg_duration
-            FROM channel c
-            JOIN playlist p ON c.channel_id = p.channel_id
-            JOIN video v ON p.playlist_id = v.playlist_id
-            GROUP BY c.channel_id;
-        """,
-        "10. Which videos have the highest number of comments, and what are their corresponding channel names?": """
-            SELECT c.channel_name, v.video_name, COUNT(cm.comment_id) AS comment_count
-            FROM channel c
-            JOIN playlist p ON c.channel_id = p.channel_id
-            JOIN video v ON p.playlist_id = v.playlist_id
-            LEFT JOIN comment cm ON v.video_id = cm.video_id
-            GROUP BY v.video_id
-            ORDER BY comment_count DESC
-            LIMIT 1;
-        """
+
+def commit_load(conn, cursor):
+    """Commits loaded rows together with a bump of the warehouse generation, so cached query results go stale exactly then."""
+    cursor.execute("UPDATE warehouse_meta SET generation = generation + 1")
+    conn.commit()
+
+
+def bulk_upsert(conn, cursor, table, rows, batch_size=500, commit_per_batch=False):
+    """Upserts rows into table with one multi-row INSERT per batch, returns its load stats."""
+    start = time.perf_counter()
+    for i in range(0, len(rows), batch_size):
+        batch = rows[i:i+batch_size]
+        params = [value for row in batch for value in row] # flatten the tuples to match the placeholders
+        cursor.execute(_upsert_sql(table, len(batch)), params)
+        if commit_per_batch:
+            commit_load(conn, cursor)
+    seconds = time.perf_counter() - start
+    metrics.record_insert(table, len(rows), seconds)
+    return {
+        "rows": len(rows),
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(len(rows) / seconds, 1) if seconds > 0 else None
     }
 
-    results = {}
-    for sel in selection:
-        cursor.execute(query_map[sel])
+
+LOAD_ORDER = ["channel", "playlist", "video", "comment"] # parents first so the child rows always find their keys
+
+# table -> (vectorized normalizer or None, row builder)
+TABLE_LOADERS = {
+    "channel": (normalize_channel_df, channel_rows),
+    "playlist": (None, playlist_rows),
+    "video": (normalize_video_df, video_rows),
+    "comment": (normalize_comment_df, comment_rows)
+}
+
+
+def load_records(conn, cursor, table, records, batch_size=500):
+    """Upserts one batch of API records (list of dicts) into table and commits, returns (load stats, unparseable counts)."""
+    normalize, build_rows = TABLE_LOADERS[table]
+    df = pd.DataFrame(records)
+    issues = {}
+    if normalize:
+        df, issues = normalize(df)
+    stats = bulk_upsert(conn, cursor, table, build_rows(df), batch_size)
+    commit_load(conn, cursor)
+    return stats, issues
+
+
+# rollups are recomputed for the touched keys rather than adjusted by deltas: upserts re-send rows
+# that are already stored, so adding deltas would double count them. {where} limits the refresh.
+VIDEO_ROLLUP_SQL = """
+    INSERT INTO video_rollup (video_id, channel_id, comment_count)
+    SELECT v.video_id, p.channel_id, COUNT(cm.comment_id)
+    FROM video v
+    LEFT JOIN playlist p ON v.playlist_id = p.playlist_id
+    LEFT JOIN comment cm ON v.video_id = cm.video_id
+    {where}
+    GROUP BY v.video_id, p.channel_id
+    ON DUPLICATE KEY UPDATE
+        channel_id = VALUES(channel_id),
+        comment_count = VALUES(comment_count)
+"""
+
+CHANNEL_ROLLUP_SQL = """
+    INSERT INTO channel_rollup (channel_id, video_count, total_views, total_duration, avg_duration, comment_count)
+    SELECT c.channel_id, COUNT(v.video_id), COALESCE(SUM(v.view_count), 0), COALESCE(SUM(v.duration), 0),
+           AVG(v.duration), COALESCE(SUM(r.comment_count), 0)
+    FROM channel c
+    LEFT JOIN playlist p ON c.channel_id = p.channel_id
+    LEFT JOIN video v ON p.playlist_id = v.playlist_id
+    LEFT JOIN video_rollup r ON v.video_id = r.video_id
+    {where}
+    GROUP BY c.channel_id
+    ON DUPLICATE KEY UPDATE
+        video_count = VALUES(video_count),
+        total_views = VALUES(total_views),
+        total_duration = VALUES(total_duration),
+        avg_duration = VALUES(avg_duration),
+        comment_count = VALUES(comment_count)
+"""
+
+ROLLUP_CHUNK = 1000 # keys per IN (...) list
+
+
+def refresh_rollups(conn, cursor, video_ids, channel_ids):
+    """Recomputes the rollup rows of the given videos and of every channel they or channel_ids belong to."""
+    start = time.perf_counter()
+    video_ids = list(dict.fromkeys(v for v in video_ids if v)) # de-duplicated, order kept
+    channel_ids = set(c for c in channel_ids if c)
+    for i in range(0, len(video_ids), ROLLUP_CHUNK):
+        chunk = video_ids[i:i+ROLLUP_CHUNK]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        cursor.execute(VIDEO_ROLLUP_SQL.format(where=f"WHERE v.video_id IN ({placeholders})"), chunk)
+        cursor.execute(f"SELECT DISTINCT channel_id FROM video_rollup WHERE video_id IN ({placeholders})", chunk)
+        channel_ids.update(row[0] for row in cursor.fetchall() if row[0])
+    channel_ids = list(channel_ids)
+    for i in range(0, len(channel_ids), ROLLUP_CHUNK):
+        chunk = channel_ids[i:i+ROLLUP_CHUNK]
+        cursor.execute(CHANNEL_ROLLUP_SQL.format(where=f"WHERE c.channel_id IN ({', '.join(['%s'] * len(chunk))})"), chunk)
+    commit_load(conn, cursor)
+    return {"videos": len(video_ids), "channels": len(channel_ids), "seconds": round(time.perf_counter() - start, 4)}
+
+
+def insert_data_to_mysql(channel_df, playlist_df, video_df, comment_df, batch_size=500, commit_per_batch=False):
+    """Bulk loads the four DataFrames, commits per table (or per batch) and returns rows/sec per table."""
+    # all type conversion happens here once per column, the row builders below only zip the columns
+    channel_df, channel_issues = normalize_channel_df(channel_df)
+    video_df, video_issues = normalize_video_df(video_df)
+    comment_df, comment_issues = normalize_comment_df(comment_df)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    stats = {}
+    load_error = None
+    try:
+        for table, rows in ( # same order as LOAD_ORDER
+            ("channel", channel_rows(channel_df)),
+            ("playlist", playlist_rows(playlist_df)),
+            ("video", video_rows(video_df)),
+            ("comment", comment_rows(comment_df))
+        ):
+            stats[table] = bulk_upsert(conn, cursor, table, rows, batch_size, commit_per_batch)
+            commit_load(conn, cursor)
+    except Exception as e:
+        load_error = e
+    try:
+        # tables committed before a failure (videos, say, when the comments fail) still get their rollups
+        conn.rollback() # drops the uncommitted rest of a failed table, a no-op otherwise
+        stats["rollups"] = refresh_rollups(
+            conn, cursor,
+            _column(video_df, 'Video_Id') + _column(comment_df, 'video_id'),
+            _column(channel_df, 'channel_id')
+        )
+    except Exception:
+        if load_error is None:
+            raise # otherwise the load error below is the one worth reporting
+    finally:
+        cursor.close()
+        conn.close() # on a pooled connection this hands it back to the pool
+    if load_error is not None:
+        raise load_error
+    stats["unparseable_values"] = {**channel_issues, **video_issues, **comment_issues}
+    return stats
+
+def _to_api_timestamp(value):
+    # DATETIME from MySQL -> the ISO format the API uses, so watermarks compare directly with API strings
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ") if value else None
+
+
+def _fetch_map(sql, keys):
+    # runs sql with an IN (...) list of keys and returns {first column: second column}
+    if not keys:
+        return {}
+    keys = list(keys)
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(sql.format(placeholders=", ".join(["%s"] * len(keys))), keys)
+        return dict(cursor.fetchall())
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def get_playlist_watermarks(playlist_ids):
+    """Returns {playlist_id: ISO timestamp of the newest stored video} for the playlists already in the warehouse."""
+    latest = _fetch_map("""
+        SELECT playlist_id, MAX(published_date)
+        FROM video
+        WHERE playlist_id IN ({placeholders})
+        GROUP BY playlist_id
+    """, playlist_ids)
+    return {pid: _to_api_timestamp(ts) for pid, ts in latest.items()}
+
+
+def get_comment_watermarks(video_ids):
+    """Returns {video_id: ISO timestamp of the newest stored comment}."""
+    latest = _fetch_map("""
+        SELECT video_id, MAX(comment_published_date)
+        FROM comment
+        WHERE video_id IN ({placeholders})
+        GROUP BY video_id
+    """, video_ids)
+    return {vid: _to_api_timestamp(ts) for vid, ts in latest.items()}
+
+
+def get_stored_videos(playlist_ids):
+    """Returns {video_id: playlist_id} for every stored video of the given playlists."""
+    return _fetch_map("""
+        SELECT video_id, playlist_id
+        FROM video
+        WHERE playlist_id IN ({placeholders})
+    """, playlist_ids)
+
+
+def get_hot_videos(playlist_ids, hot_days=7):
+    """Returns {video_id: playlist_id} for stored videos published in the last hot_days days, their stats still move."""
+    if not playlist_ids:
+        return {}
+    playlist_ids = list(playlist_ids)
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        # published_date is stored as naive UTC, so compare with UTC_TIMESTAMP() and not NOW() (session time zone)
+        cursor.execute(f"""
+            SELECT video_id, playlist_id
+            FROM video
+            WHERE playlist_id IN ({", ".join(["%s"] * len(playlist_ids))})
+              AND published_date >= UTC_TIMESTAMP() - INTERVAL %s DAY
+        """, playlist_ids + [hot_days])
+        return dict(cursor.fetchall())
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# Add all queries here, the keys are also the question labels shown in the app.
+# Queries 2, 4, 7, 9 and 10 read the rollup tables (see schema.py) instead of aggregating the full join on every click.
+QUERY_MAP = {
+    "1. What are the names of all the videos and their corresponding channels?": """
+        SELECT c.channel_name, v.video_name
+        FROM channel c
+        LEFT JOIN playlist p ON c.channel_id = p.channel_id
+        LEFT JOIN video v ON p.playlist_id = v.playlist_id
+        ORDER BY c.channel_name, c.channel_id, v.video_id;
+    """,
+    "2. Which channels have the most number of videos, and how many videos do they have?": """
+        SELECT c.channel_name, r.video_count
+        FROM channel_rollup r
+        JOIN channel c ON c.channel_id = r.channel_id
+        ORDER BY r.video_count DESC
+        LIMIT 1;
+    """,
+    "3. What are the top 10 most viewed videos and their respective channels?": """
+        SELECT c.channel_name, v.video_name, v.view_count
+        FROM channel c
+        JOIN playlist p ON c.channel_id = p.channel_id
+        JOIN video v ON p.playlist_id = v.playlist_id
+        ORDER BY v.view_count DESC
+        LIMIT 10;
+    """,
+    "4. How many comments were made on each video, and what are their corresponding video names?": """
+        SELECT v.video_name, r.comment_count
+        FROM video_rollup r
+        JOIN video v ON v.video_id = r.video_id
+        ORDER BY r.comment_count DESC, r.video_id DESC;
+    """,
+    "5. Which videos have the highest number of likes, and what are their corresponding channel names?": """
+        SELECT c.channel_name, v.video_name, v.like_count
+        FROM channel c
+        JOIN playlist p ON c.channel_id = p.channel_id
+        JOIN video v ON p.playlist_id = v.playlist_id
+        ORDER BY v.like_count DESC
+        LIMIT 1;
+    """,
+    "6. What is the total number of likes and dislikes for each video, and what are their corresponding video names?": """
+        SELECT video_name, like_count, dislike_count
+        FROM video
+        ORDER BY like_count DESC, video_id DESC;
+    """,
+    "7. What is the total number of views for each channel, and what are their corresponding channel names?": """
+        SELECT c.channel_name, r.total_views
+        FROM channel_rollup r
+        JOIN channel c ON c.channel_id = r.channel_id
+        WHERE r.video_count > 0;
+    """,
+    "8. What are the names of all the channels that have published videos in the year 2022?": """
+        SELECT DISTINCT c.channel_name
+        FROM channel c
+        JOIN playlist p ON c.channel_id = p.channel_id
+        JOIN video v ON p.playlist_id = v.playlist_id
+        WHERE v.published_date >= '2022-01-01' AND v.published_date < '2023-01-01';
+    """,
+    "9. What is the average duration of all videos in each channel, and what are their corresponding channel names?": """
+        SELECT c.channel_name, r.avg_duration
+        FROM channel_rollup r
+        JOIN channel c ON c.channel_id = r.channel_id
+        WHERE r.video_count > 0;
+    """,
+    "10. Which videos have the highest number of comments, and what are their corresponding channel names?": """
+        SELECT c.channel_name, v.video_name, r.comment_count
+        FROM video_rollup r
+        JOIN video v ON v.video_id = r.video_id
+        JOIN channel c ON c.channel_id = r.channel_id
+        ORDER BY r.comment_count DESC
+        LIMIT 1;
+    """
+}
+
+
+# Queries 1, 4 and 6 return a row per video (or more), so they are served a page at a time.
+# Their ORDER BY keeps pages stable; 4 and 6 walk idx_video_rollup_comments / idx_video_likes backwards.
+# query number -> COUNT(*) statement for the total row count shown next to the page
+PAGED_QUERIES = {
+    "1": """
+        SELECT COUNT(*)
+        FROM channel c
+        LEFT JOIN playlist p ON c.channel_id = p.channel_id
+        LEFT JOIN video v ON p.playlist_id = v.playlist_id
+    """,
+    "4": "SELECT COUNT(*) FROM video_rollup r JOIN video v ON v.video_id = r.video_id",
+    "6": "SELECT COUNT(*) FROM video"
+}
+
+# aggregates the charts of the paged queries are drawn from, a row per channel instead of a row per video
+CHART_QUERIES = {
+    "1": """
+        SELECT c.channel_name, r.video_count
+        FROM channel_rollup r
+        JOIN channel c ON c.channel_id = r.channel_id
+        ORDER BY r.video_count DESC
+        LIMIT 25
+    """,
+    "4": """
+        SELECT c.channel_name, r.comment_count
+        FROM channel_rollup r
+        JOIN channel c ON c.channel_id = r.channel_id
+        ORDER BY r.comment_count DESC
+        LIMIT 25
+    """,
+    "6": """
+        SELECT c.channel_name, SUM(v.like_count) AS like_count, SUM(v.dislike_count) AS dislike_count
+        FROM video v
+        JOIN playlist p ON p.playlist_id = v.playlist_id
+        JOIN channel c ON c.channel_id = p.channel_id
+        GROUP BY c.channel_id, c.channel_name
+        ORDER BY like_count DESC
+        LIMIT 25
+    """
+}
+
+PAGE_SIZE = 100
+QUERY_CACHE_SIZE = int(os.environ.get("QUERY_CACHE_SIZE", 256)) # results kept in memory, least recently used go first
+QUERY_WORKERS = int(os.environ.get("QUERY_WORKERS", 4)) # summary queries run at once, keep it below MYSQL_POOL_SIZE
+
+# results of the summary and chart queries for one warehouse generation (see commit_load): every load
+# bumps the generation, so a result is reused only while no row has been written since it was computed
+_query_cache = OrderedDict()
+_query_cache_generation = None
+_query_cache_lock = threading.Lock()
+
+
+def query_number(question):
+    # "4. How many comments..." -> "4"
+    return question.split(".", 1)[0]
+
+
+def warehouse_generation(cursor):
+    """Returns the load counter in warehouse_meta, it goes up with every committed load."""
+    cursor.execute("SELECT generation FROM warehouse_meta")
+    return cursor.fetchall()[0][0]
+
+
+def _cache_get(generation, key):
+    global _query_cache_generation
+    with _query_cache_lock:
+        if generation != _query_cache_generation: # something was loaded since, every cached result is stale
+            _query_cache.clear()
+            _query_cache_generation = generation
+            return None
+        result = _query_cache.get(key)
+        if result is not None:
+            _query_cache.move_to_end(key)
+        return result
+
+
+def _cache_put(generation, key, result):
+    with _query_cache_lock:
+        if generation != _query_cache_generation:
+            return # a newer generation was seen while this query ran
+        _query_cache[key] = result
+        while len(_query_cache) > QUERY_CACHE_SIZE:
+            _query_cache.popitem(last=False)
+
+
+def clear_query_cache():
+    with _query_cache_lock:
+        _query_cache.clear()
+
+
+def run_query(cursor, question, page=1, page_size=PAGE_SIZE):
+    """Runs one summary query, returns (rows, columns, total).
+
+    Paged queries return only the given page (1-based) and total is the full row count, page_size=None returns every row.
+    """
+    sql = QUERY_MAP[question].strip().rstrip(";")
+    count_sql = PAGED_QUERIES.get(query_number(question))
+    start = time.perf_counter()
+    if count_sql and page_size:
+        cursor.execute(count_sql)
+        total = cursor.fetchall()[0][0]
+        cursor.execute(f"{sql} LIMIT %s OFFSET %s", (page_size, (max(page, 1) - 1) * page_size))
+        rows = cursor.fetchall()
+    else:
+        cursor.execute(sql)
         rows = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description] #cursor.description holds metadata about the columns. it gives the column name
-        results[sel] = (rows, columns)
+        total = len(rows)
+    columns = [desc[0] for desc in cursor.description] #cursor.description holds metadata about the columns. it gives the column name
+    metrics.record_query(question, time.perf_counter() - start, len(rows))
+    return rows, columns, total
+
+
+def _summary_key(question, page, page_size):
+    return (question, page, page_size) if query_number(question) in PAGED_QUERIES else (question,)
+
+
+def _run_query_on_own_connection(question, page, page_size):
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        return run_query(cursor, question, page, page_size)
+    finally:
+        cursor.close()
+        conn.close()
+
 
-    cursor.close()
-    conn.close()
-    return results
+def iter_channel_summary(selection, pages=None, page_size=PAGE_SIZE, max_workers=QUERY_WORKERS, use_cache=True):
+    """Runs the selected queries concurrently, each on its own pooled connection, and yields (question, (rows, columns, total))
+    as soon as each one finishes. Cached results come first. pages maps question -> page number.
+    A query that fails yields (question, exception) instead, the other queries still run and are yielded.
+
+    Results computed since the last load are served from memory, the returned rows must not be modified.
+    """
+    pages = pages or {}
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        generation = warehouse_generation(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+
+    cached, pending = [], []
+    for sel in selection:
+        key = _summary_key(sel, pages.get(sel, 1), page_size)
+        result = _cache_get(generation, key) if use_cache else None
+        if result is not None:
+            cached.append((sel, result))
+        else:
+            pending.append((sel, key))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending) or 1))) as executor:
+        # submitted before the cached results are handed out, so the queries run while the caller renders those
+        futures = {
+            executor.submit(_run_query_on_own_connection, sel, pages.get(sel, 1), page_size): (sel, key)
+            for sel, key in pending
+        }
+        for sel, result in cached:
+            metrics.record_query(sel, 0.0, len(result[0]), cached=True)
+            yield sel, result
+        for future in as_completed(futures):
+            sel, key = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                yield sel, e
+                continue
+            _cache_put(generation, key, result)
+            yield sel, result
+
+
+def get_channel_summary(selection, pages=None, page_size=PAGE_SIZE, max_workers=QUERY_WORKERS, use_cache=True):
+    """Runs the selected queries (see iter_channel_summary), returns {question: (rows, columns, total)} in selection order.
+
+    Raises the first failure, after every query has finished.
+    """
+    results = dict(iter_channel_summary(selection, pages, page_size, max_workers, use_cache))
+    for result in results.values():
+        if isinstance(result, Exception):
+            raise result
+    return {sel: results[sel] for sel in selection if sel in results}
+
+
+def get_chart_data(question):
+    """Returns (rows, columns) of the aggregate behind a paged query's chart, None for the other queries."""
+    sql = CHART_QUERIES.get(query_number(question))
+    if sql is None:
+        return None
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        generation = warehouse_generation(cursor)
+        key = ("chart", question)
+        result = _cache_get(generation, key)
+        if result is None:
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+            result = (rows, [desc[0] for desc in cursor.description])
+            _cache_put(generation, key, result)
+        return result
+    finally:
+        cursor.close()
+        conn.close()
 
 
@@ -0,0 +1,201 @@
+"""Columnar staging of harvest runs: typed Parquet files per table, partitioned by run date and run id.
+
+    staging/<table>/run_date=2026-10-18/run_id=20261018T101500-3f9a1c/part-00000.parquet
+
+A staged run can be loaded into MySQL again without touching the API (replay_run), and analytics can read
+only the columns they need straight from the files (read_staged). Needs pyarrow.
+
+    python staging.py list
+    python staging.py replay <run id>
+"""
+import argparse
+import json
+import os
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError: # optional, only staging needs it
+    pa = None
+
+from sql_migration import insert_data_to_mysql
+from transform import normalize_channel_df, normalize_video_df, normalize_comment_df
+
+STAGING_DIR = os.environ.get("YT_STAGING_DIR", "staging")
+TABLES = ["channel", "playlist", "video", "comment"] # same order as convert_to_dataframes returns the frames
+
+# table -> vectorized normalizer or None, the same conversions the MySQL load does
+NORMALIZERS = {
+    "channel": normalize_channel_df,
+    "playlist": None,
+    "video": normalize_video_df,
+    "comment": normalize_comment_df
+}
+
+
+def require_pyarrow():
+    """Raises RuntimeError when pyarrow is missing, callers check before they fetch or load anything."""
+    if pa is None:
+        raise RuntimeError("staging needs pyarrow: pip install pyarrow")
+
+
+def _schemas():
+    # built on first use so that importing this module works without pyarrow
+    text = pa.string()
+    label = pa.dictionary(pa.int32(), pa.string()) # few distinct values, each stored once per file
+    stamp = pa.timestamp("s") # naive UTC, like the stored DATETIMEs
+    return {
+        "channel": pa.schema([
+            ("channel_Name", text), ("channel_id", text), ("Subscription_Count", pa.int64()),
+            ("Channel_Views", pa.int64()), ("Channel_Description", text), ("Playlist_Id", text)
+        ]),
+        "playlist": pa.schema([("playlist_id", text), ("channel_id", text), ("playlist_name", text)]),
+        "video": pa.schema([
+            ("Video_Id", text), ("playlist_id", text), ("Video_Name", text), ("Video_Description", text),
+            ("Tags", pa.list_(label)), ("PublishedAt", stamp), ("View_Count", pa.int64()), ("Like_Count", pa.int64()),
+            ("Dislike_Count", pa.int64()), ("Favorite_Count", pa.int64()), ("Comment_Count", pa.int64()),
+            ("Duration", pa.int64()), ("Thumbnail", text), ("Caption_Status", label)
+        ]),
+        "comment": pa.schema([
+            ("Comment_Id", text), ("video_id", text), ("Comment_Text", text), ("Comment_Author", text),
+            ("Comment_PublishedAt", stamp)
+        ])
+    }
+
+
+def _tags_array(series):
+    # list of tags per video -> list<dictionary<string>>, every distinct tag is stored once
+    lists = [list(tags) if isinstance(tags, (list, tuple, np.ndarray)) else [] for tags in series]
+    offsets = pa.array(np.cumsum([0] + [len(tags) for tags in lists]), type=pa.int32())
+    values = pa.array([tag for tags in lists for tag in tags], type=pa.string()).dictionary_encode()
+    return pa.ListArray.from_arrays(offsets, values)
+
+
+def _column_array(series, field):
+    if field.name == "Tags":
+        return _tags_array(series)
+    if pa.types.is_dictionary(field.type):
+        return pa.array(series, type=pa.string(), from_pandas=True).dictionary_encode()
+    if pa.types.is_timestamp(field.type):
+        return pa.array(series, from_pandas=True).cast(field.type, safe=False) # API timestamps are whole seconds
+    return pa.array(series, type=field.type, from_pandas=True)
+
+
+def to_arrow(table, df):
+    """Typed Arrow table of one harvested DataFrame (already normalized). Columns without a schema entry keep inferred types."""
+    require_pyarrow()
+    schema = _schemas()[table]
+    names, arrays = [], []
+    for column in df.columns:
+        names.append(column)
+        if column in schema.names:
+            arrays.append(_column_array(df[column], schema.field(column)))
+        else:
+            arrays.append(pa.array(df[column], from_pandas=True))
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def new_run_id(now=None):
+    # sortable by time, the suffix keeps two runs started in the same second apart
+    return f"{(now or datetime.now()).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def _run_dir(root, table, run_id):
+    run_date = f"{run_id[:4]}-{run_id[4:6]}-{run_id[6:8]}"
+    return os.path.join(root, table, f"run_date={run_date}", f"run_id={run_id}")
+
+
+def stage_table(table, df, run_id, part=0, root=None):
+    """Writes one DataFrame of harvested records as Parquet part `part` of run_id, returns the number of rows written."""
+    require_pyarrow()
+    if df is None or df.empty:
+        return 0
+    normalize = NORMALIZERS[table]
+    if normalize:
+        df, _ = normalize(df)
+    arrow_table = to_arrow(table, df)
+    directory = _run_dir(root or STAGING_DIR, table, run_id)
+    os.makedirs(directory, exist_ok=True)
+    pq.write_table(arrow_table, os.path.join(directory, f"part-{part:05d}.parquet"), compression="zstd")
+    return arrow_table.num_rows
+
+
+def stage_frames(frames, run_id=None, root=None):
+    """Stages the four DataFrames of a harvest run, returns {"run_id", "rows": {table: rows}}."""
+    run_id = run_id or new_run_id()
+    rows = {table: stage_table(table, df, run_id, root=root) for table, df in zip(TABLES, frames)}
+    return {"run_id": run_id, "rows": rows}
+
+
+def list_runs(root=None):
+    """Returns the ids of the staged runs, oldest first."""
+    root = root or STAGING_DIR
+    runs = set()
+    for table in TABLES:
+        table_dir = os.path.join(root, table)
+        if not os.path.isdir(table_dir):
+            continue
+        for date_dir in os.listdir(table_dir):
+            for run_dir in os.listdir(os.path.join(table_dir, date_dir)):
+                if run_dir.startswith("run_id="):
+                    runs.add(run_dir[len("run_id="):])
+    return sorted(runs)
+
+
+def read_staged(table, columns=None, run_ids=None, root=None):
+    """Reads the staged rows of table as a DataFrame.
+
+    Only the given columns are read from the files (all when None), and run_ids skips the other runs' directories.
+    The run_date and run_id partition columns can be selected like the others.
+    """
+    require_pyarrow()
+    table_dir = os.path.join(root or STAGING_DIR, table)
+    if not os.path.isdir(table_dir):
+        return pd.DataFrame(columns=columns or [])
+    partitioning = ds.partitioning(pa.schema([("run_date", pa.string()), ("run_id", pa.string())]), flavor="hive")
+    dataset = ds.dataset(table_dir, format="parquet", partitioning=partitioning)
+    row_filter = ds.field("run_id").isin(list(run_ids)) if run_ids else None
+    return dataset.to_table(columns=columns, filter=row_filter).to_pandas()
+
+
+def load_run(run_id, root=None):
+    """Returns the four DataFrames of a staged run, typed, in the order insert_data_to_mysql takes them."""
+    frames = []
+    for table in TABLES:
+        df = read_staged(table, run_ids=[run_id], root=root)
+        frames.append(df.drop(columns=["run_date", "run_id"], errors="ignore"))
+    return frames
+
+
+def replay_run(run_id, batch_size=500, root=None):
+    """Loads a staged run into MySQL again without calling the API, returns the load stats."""
+    return insert_data_to_mysql(*load_run(run_id, root), batch_size=batch_size)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List staged harvest runs or load one into MySQL again.")
+    parser.add_argument("--root", default=STAGING_DIR, help="staging directory (YT_STAGING_DIR)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="print the staged run ids")
+    replay = commands.add_parser("replay", help="load a staged run into MySQL")
+    replay.add_argument("run_id")
+    replay.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for run_id in list_runs(args.root):
+            print(run_id)
+    else:
+        if args.run_id not in list_runs(args.root):
+            parser.error(f"no staged run {args.run_id} under {args.root}")
+        print(json.dumps(replay_run(args.run_id, args.batch_size, args.root), default=str))
+
+
+if __name__ == "__main__":
+    main()
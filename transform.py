@@ -0,0 +1,84 @@
+"""Vectorized type normalization of the harvested DataFrames, run once before loading.
+
+Each normalize_* function returns (typed DataFrame, {column: number of values that could not be parsed}).
+Unparseable counts and durations become 0 and unparseable timestamps NaT, but they are counted, not hidden.
+"""
+import numpy as np
+import pandas as pd
+
+# the API's "2024-01-31T10:00:00Z"; %z reads the Z as UTC and keeps pandas on its fast ISO parser,
+# a literal "Z" in the format sends every value through the slow strptime path
+API_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+
+# ISO-8601 durations as the API sends them: PT4M13S, PT1H2M, P1DT3H, P0D (live streams)
+ISO_DURATION_PATTERN = r"^P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?$"
+DURATION_UNIT_SECONDS = np.array([7 * 86400, 86400, 3600, 60, 1], dtype="float64")
+
+VIDEO_COUNT_COLUMNS = ["View_Count", "Like_Count", "Dislike_Count", "Favorite_Count", "Comment_Count"]
+
+
+def _bad(before, after):
+    # values that were present in the input but did not survive the conversion
+    return int((before.notna() & after.isna()).sum())
+
+
+def to_counts(series):
+    """String counts -> int64, returns (converted series, number of unparseable values)."""
+    numbers = pd.to_numeric(series, errors="coerce")
+    return numbers.fillna(0).astype("int64"), _bad(series, numbers)
+
+
+def to_timestamps(series):
+    """API timestamps ("2024-01-31T10:00:00Z") -> datetime64, returns (converted series, number of unparseable values)."""
+    stamps = pd.to_datetime(series, format=API_TIMESTAMP_FORMAT, errors="coerce", utc=True).dt.tz_localize(None) # naive UTC, like the stored DATETIMEs
+    return stamps, _bad(series, stamps)
+
+
+def to_duration_seconds(series):
+    """ISO-8601 durations -> whole seconds as int64, returns (converted series, number of unparseable values)."""
+    if pd.api.types.is_integer_dtype(series): # already seconds, e.g. read back from the Parquet staging files
+        return series.astype("int64"), 0
+    # videos share few distinct durations, so the regex runs once per distinct value and the result is mapped back
+    codes, uniques = pd.factorize(series) # missing values get code -1
+    parts = pd.Series(uniques, dtype="string").str.extract(ISO_DURATION_PATTERN)
+    # "P" and "PT" match the pattern with every part empty, they carry no duration so they count as bad
+    matched = parts.notna().any(axis=1).to_numpy()
+    seconds = (parts.astype("float64").fillna(0).to_numpy() @ DURATION_UNIT_SECONDS).astype("int64")
+    seconds[~matched] = 0
+    present = codes >= 0
+    result = np.zeros(len(series), dtype="int64")
+    result[present] = seconds[codes[present]]
+    return pd.Series(result, index=series.index), int((~matched[codes[present]]).sum())
+
+
+def normalize_video_df(video_df):
+    """Converts the count, PublishedAt and Duration columns of video_df in bulk."""
+    df = video_df.copy()
+    issues = {}
+    for column in VIDEO_COUNT_COLUMNS:
+        if column in df.columns:
+            df[column], issues[column] = to_counts(df[column])
+    if "PublishedAt" in df.columns:
+        df["PublishedAt"], issues["PublishedAt"] = to_timestamps(df["PublishedAt"])
+    if "Duration" in df.columns:
+        df["Duration"], issues["Duration"] = to_duration_seconds(df["Duration"])
+    return df, issues
+
+
+def normalize_comment_df(comment_df):
+    """Converts the Comment_PublishedAt column of comment_df in bulk."""
+    df = comment_df.copy()
+    issues = {}
+    if "Comment_PublishedAt" in df.columns:
+        df["Comment_PublishedAt"], issues["Comment_PublishedAt"] = to_timestamps(df["Comment_PublishedAt"])
+    return df, issues
+
+
+def normalize_channel_df(channel_df):
+    """Converts the channel statistics columns of channel_df in bulk."""
+    df = channel_df.copy()
+    issues = {}
+    for column in ("Subscription_Count", "Channel_Views"):
+        if column in df.columns:
+            df[column], issues[column] = to_counts(df[column])
+    return df, issues
@@ -1,23 +1,68 @@
 import streamlit as st
-from sql_migration import insert_data_to_mysql,get_channel_summary
+from sql_migration import insert_data_to_mysql,iter_channel_summary,get_chart_data,get_connection_pool,QUERY_MAP,PAGED_QUERIES,PAGE_SIZE,query_number
 import pandas as pd
+from datetime import datetime
 import altair as alt
 import plotly.express as px
 
-from api_functions import (
-    get_channel_ids,
-    get_channel_data,
-    get_video_ids,
-    get_video_details,
-    get_comment_details,
-    convert_to_dataframes
-)
+from api_cache import get_cache
+from api_scheduler import DAILY_QUOTA
+from harvest import run_pipeline
+import metrics
+import json
+from api_functions import get_channel_ids
+
+@st.cache_resource
+def warehouse_pool():
+    # created once per server process and shared by every rerun and session, instead of a new connection per click
+    return get_connection_pool()
+
+
+@st.cache_data(show_spinner=False, max_entries=20)
+def cached_harvest(channel_ids, max_videos, max_comments, incremental, hot_days, profile=False, refresh_count=0, _refresh=False):
+    # keyed on the selected channel ids and fetch options, so reruns caused by other widgets
+    # (insert radio, query picker, ...) reuse the result instead of re-harvesting.
+    # refresh_count is bumped by the refresh button for this channel set only; _refresh (not part of the key,
+    # the leading underscore tells Streamlit not to hash it) makes that one run bypass the on-disk API cache.
+    if incremental:
+        warehouse_pool()
+    pipeline_kwargs = dict(
+        channel_ids=list(channel_ids),
+        max_videos_per_channel=max_videos or None,
+        max_comments_per_video=max_comments or None,
+        incremental=incremental,
+        hot_days=hot_days,
+        load=False,
+        refresh=_refresh
+    )
+    if profile:
+        harvest, harvest["profile"] = metrics.profile_run(run_pipeline, **pipeline_kwargs)
+    else:
+        harvest = run_pipeline(**pipeline_kwargs)
+    harvest["harvested_at"] = datetime.now().strftime("%H:%M:%S")
+    return harvest
+
 
 st.title("📺 YouTube Data Harvesting and Warehousing using SQL and Streamlit")
 
+# API quota spent today (cache hits are free), shown in the sidebar so a rerun's cost is visible
+response_cache = get_cache()
+if response_cache is not None:
+    quota_units, quota_by_endpoint = response_cache.quota_used()
+    st.sidebar.metric("YouTube API quota used today", f"{quota_units} / {DAILY_QUOTA} units")
+    if quota_by_endpoint:
+        st.sidebar.dataframe(pd.DataFrame(quota_by_endpoint).T)
+    if st.sidebar.button("🗑️ Clear API cache"):
+        response_cache.clear()
+
 # 1. User Inputs
 query = st.text_input("Enter channel topic (e.g. 'data science')", value="data science")
 max_channels = st.slider("Number of channels to fetch", 1,10)
+max_videos = st.number_input("Max videos per channel (0 = all)", min_value=0, value=0, step=50)
+max_comments = st.number_input("Max comments per video (0 = all)", min_value=0, value=100, step=100)
+profile_harvest = st.sidebar.checkbox("Profile the harvest with cProfile")
+incremental = st.checkbox("Incremental: only fetch uploads and comments newer than the warehouse")
+hot_days = st.slider("Refresh statistics of videos published in the last N days", 1, 90, 7, disabled=not incremental)
 
 # Step 1: Fetch channel IDs (runs only when button is pressed)
 if st.button("🔍 Fetch Channel Data"):
@@ -42,34 +87,35 @@ if "fetched_channel_ids" in st.session_state:
         combined_channel_ids.append(manual_channel_id)
 
     if combined_channel_ids:
-        with st.spinner("Retrieving channel details..."):
-            channel_data, playlist_data = get_channel_data(combined_channel_ids)
-        st.success("Channels Data Retrieved!")
-        # Get uploads playlist IDs
-        with st.spinner("Retrieving youtube upload Ids..."):
-            playlist_ids = [c['Playlist_Id'] for c in channel_data]
-        st.success("Uploads Ids Retrieved")     
-
-        with st.spinner("Getting video IDs..."):
-            video_ids,video_playlist_map = get_video_ids(playlist_ids)
-        st.success("Videos Ids Retrieved")    
-
-        with st.spinner("Fetching video metadata..."):
-            videos = get_video_details(video_ids,video_playlist_map)
-        st.success(f"Fetched metadata for {len(videos)} videos.")
-        all_comments = []
-        for video in videos:
-            with st.spinner("Fetching top comments..."):
-                comment = get_comment_details([video['Video_Id']])
-                all_comments.extend(comment)
-                #if comment:
-                    #for c in comment:
-                        #pass
-                #else:
-                    #st.write("No comments available for this video.")
-        st.success(f"Fetched {len(comment)} comments.")         
-
-        channel_df, playlist_df, video_df, comment_df = convert_to_dataframes(channel_data,playlist_data,videos,all_comments)
+        # sorted tuple: the same channels picked in another order hit the same cache entry
+        channel_key = tuple(sorted(set(combined_channel_ids)))
+        refresh_counts = st.session_state.setdefault("refresh_counts", {})
+        refresh = st.button("🔄 Refresh data from YouTube")
+        if refresh:
+            refresh_counts[channel_key] = refresh_counts.get(channel_key, 0) + 1 # new cache key for these channels only
+        # the whole fetch runs in harvest.run_pipeline (same code as the CLI), the app only displays its result.
+        with st.spinner("Harvesting channel, video and comment data..."):
+            harvest = cached_harvest(
+                channel_key, max_videos, max_comments, incremental, hot_days, profile_harvest,
+                refresh_counts.get(channel_key, 0), _refresh=refresh
+            )
+        st.caption(f"Harvested at {harvest['harvested_at']} — cached until you press refresh or change the channels.")
+        channel_df, playlist_df, video_df, comment_df = harvest["frames"]
+        st.success(f"Fetched {len(channel_df)} channels, {len(video_df)} videos and {len(comment_df)} comments.")
+        if harvest["delta"]:
+            st.info(
+                f"{harvest['delta']['new_videos']} new videos, {harvest['delta']['hot_videos_refreshed']} refreshed, "
+                f"{harvest['delta']['new_comments']} new comments."
+            )
+        if harvest["comment_errors"]:
+            st.warning(f"Skipped comments for {len(harvest['comment_errors'])} videos (e.g. comments disabled).")
+        with st.expander("⏱️ Stage timings (seconds)"):
+            st.json(harvest["timings"])
+        if harvest.get("profile"):
+            with st.expander("🔬 cProfile of this harvest"):
+                st.text(harvest["profile"])
+
+    if combined_channel_ids:
         st.subheader("📊 Channel Data")
         st.dataframe(channel_df)
 
@@ -85,35 +131,50 @@ if "fetched_channel_ids" in st.session_state:
         
         st.subheader("🙳️ Insert Data into SQL Server")
         user_confirmation = st.radio("Do you want to insert the data into the SQL database?", ["No", "Yes"])
+        batch_size = st.number_input("Rows per INSERT batch", min_value=1, max_value=5000, value=500, step=100)
         if user_confirmation == "Yes":
             if st.button("✅ Confirm Insert"):
-                insert_data_to_mysql(channel_df, playlist_df, video_df, comment_df)
+                warehouse_pool()
+                load_stats = insert_data_to_mysql(channel_df, playlist_df, video_df, comment_df, batch_size=batch_size)
                 st.success("✅ Data inserted in SQL Database successfully.")
+                unparseable = {column: n for column, n in load_stats.pop("unparseable_values").items() if n}
+                if unparseable:
+                    st.warning(f"Values that could not be parsed (stored as 0 / empty): {unparseable}")
+                st.dataframe(pd.DataFrame(load_stats).T) # rows, seconds and rows/sec for each table
             else:
                 st.info("Data not inserted. Select 'Yes' and confirm to proceed.")
 
 
         with st.spinner("Querying SQL database..."):
-            query_options = list([
-                    "1. What are the names of all the videos and their corresponding channels?",
-                    "2. Which channels have the most number of videos, and how many videos do they have?",
-                    "3. What are the top 10 most viewed videos and their respective channels?",
-                    "4. How many comments were made on each video, and what are their corresponding video names?",
-                    "5. Which videos have the highest number of likes, and what are their corresponding channel names?",
-                    "6. What is the total number of likes and dislikes for each video, and what are their corresponding video names?",
-                    "7. What is the total number of views for each channel, and what are their corresponding channel names?",
-                    "8. What are the names of all the channels that have published videos in the year 2022?",
-                    "9. What is the average duration of all videos in each channel, and what are their corresponding channel names?",
-                    "10. Which videos have the highest number of comments, and what are their corresponding channel names?"
-                    ])
+            query_options = list(QUERY_MAP)
             selection = st.multiselect("📌 Select one or more queries to run", query_options)
+            page_size = st.number_input("Rows per page", min_value=10, max_value=1000, value=PAGE_SIZE, step=50)
             if st.button("📦 Run Selected Queries"):
+                st.session_state["shown_queries"] = selection # kept across reruns, so turning a page does not hide the results
+            shown = [question for question in st.session_state.get("shown_queries", []) if question in selection]
+            if shown:
                 with st.spinner("Running SQL queries..."):
-                    result_map = get_channel_summary(selection)
-                    if result_map:
-                        # For each query result, gives the query text as question, and unpack the result tuple into rows and columns
-                        for question,(rows, columns) in result_map.items(): 
+                    warehouse_pool()
+                    pages = {question: st.session_state.get(f"page_{query_number(question)}", 1) for question in shown}
+                    slots = {question: st.container() for question in shown} # keeps the selection order while results arrive in any order
+                    # The queries run concurrently; each result is rendered into its slot as soon as its query finishes.
+                    # Each result gives the query text as question, and the result tuple unpacks into rows, columns and total row count
+                    for question, result in iter_channel_summary(shown, pages=pages, page_size=page_size):
+                        with slots[question]:
                             st.subheader(question)
+                            if isinstance(result, Exception): # only this query failed, the others still render
+                                st.error(f"Query failed: {result}")
+                                continue
+                            rows, columns, total = result
+                            number = query_number(question)
+                            if number in PAGED_QUERIES and total:
+                                page_count = -(-total // page_size)
+                                if pages[question] > page_count: # the table shrank or the page size grew
+                                    st.session_state[f"page_{number}"] = page_count
+                                    st.rerun() # run again with the last page instead of rendering an empty, out of range one
+                                st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, key=f"page_{number}")
+                                first = (pages[question] - 1) * page_size + 1
+                                st.caption(f"Rows {first}–{first + len(rows) - 1} of {total}")
                             if not rows:
                                 st.warning(f"No data returned for: {question}")
                                 continue
@@ -121,6 +182,18 @@ if "fetched_channel_ids" in st.session_state:
                             df = pd.DataFrame(rows, columns=columns)
                             st.dataframe(df)
 
+                            # paged queries are charted from an aggregate per channel, not from the rows of the current page
+                            chart_data = get_chart_data(question)
+                            if chart_data:
+                                chart_df = pd.DataFrame(chart_data[0], columns=chart_data[1])
+                                value_column = chart_data[1][1]
+                                chart = alt.Chart(chart_df).mark_bar().encode(
+                                    x=alt.X("channel_name:N", sort='-y'),
+                                    y=f"{value_column}:Q",
+                                    tooltip=list(chart_df.columns)
+                                ).properties(title=f"{value_column.replace('_', ' ').title()} per Channel (top {len(chart_df)})")
+                                st.altair_chart(chart, use_container_width=True)
+
                             # Visualization logic per question
                             if "2. Which channels have the most number of videos" in question:
                                 chart = alt.Chart(df).mark_bar().encode(
@@ -161,8 +234,16 @@ if "fetched_channel_ids" in st.session_state:
                                     tooltip=["video_name", "comment_count", "channel_name"]
                                 ).properties(title="Most Commented Videos")
                                 st.altair_chart(chart, use_container_width=True)
-                    else:
-                        st.warning("No results found for selected queries.")
 
-                
-               
\ No newline at end of file
+
+# rendered last so it includes everything this rerun did (harvest stages, API calls, inserts, queries)
+with st.sidebar.expander("📈 Pipeline metrics"):
+    metrics_snapshot = metrics.snapshot()
+    for section, label in (("stages", "Stage wall time"), ("api", "API calls per endpoint"),
+                           ("inserts", "Rows/sec per table"), ("queries", "SQL latency per query")):
+        if metrics_snapshot[section]:
+            st.caption(label)
+            st.dataframe(pd.DataFrame(metrics_snapshot[section]).T)
+    st.download_button("⬇️ Metrics JSON", json.dumps(metrics_snapshot, indent=2), file_name="metrics.json")
+    if st.button("Reset metrics"):
+        metrics.reset()